@@ -18,6 +18,15 @@ from discord import app_commands
 from aiohttp import web
 from datetime import datetime, timedelta
 
+# orjson is much faster for the Redis queue payloads; fall back to json if it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 parser = argparse.ArgumentParser()
 parser.add_argument("--queue", default="message_queue", help="Redis queue name")
 args = parser.parse_args()
@@ -280,6 +289,24 @@ def compress_image(image_data, filename, max_size=MAX_DISCORD_FILE_SIZE, quality
 # Connect to Redis
 redis_client = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
 
+# One shared HTTP session so webhook posts and attachment downloads reuse pooled connections
+_HTTP_SESSION = None
+
+
+async def get_http_session():
+    """Return the shared aiohttp session, creating it inside the running loop on first use."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=64, keepalive_timeout=75)
+        _HTTP_SESSION = aiohttp.ClientSession(connector=connector)
+    return _HTTP_SESSION
+
+
+async def close_http_session():
+    """Close the shared aiohttp session if it was ever created."""
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+
 # Global cache to track recent message_ids and prevent duplicates
 recent_message_ids = set()
 
@@ -295,6 +322,7 @@ intents.members = True
 
 # Store for DM relay functionality
 dm_relay_endpoint = "http://127.0.0.1:5001/send_dm"  # Endpoint to send DMs via main.py
+DM_RELAY_UNIX_SOCKET = os.getenv("DM_RELAY_UNIX_SOCKET")  # e.g. /tmp/1tap_dm_relay.sock
 
 
 def get_next_version():
@@ -494,7 +522,7 @@ async def find_and_block_original_channel(channel_name, server_tag):
         if not bot_instances_data:
             return False
 
-        instances = json.loads(bot_instances_data)
+        instances = _loads(bot_instances_data)
         normalized_name = channel_name.lower().replace(" ", "-").replace("|", "")
 
         config_data = load_config()
@@ -506,23 +534,23 @@ async def find_and_block_original_channel(channel_name, server_tag):
                         headers = {"Authorization": f"Bot {BOT_TOKEN}"}
                         url = f"https://discord.com/api/v10/guilds/{server_id}/channels"
 
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(url, headers=headers) as response:
-                                if response.status == 200:
-                                    channels = await response.json()
-
-                                    for channel_data in channels:
-                                        if channel_data.get("type") == 0:  # Text channel
-                                            if channel_data["name"].lower().replace("-", "").replace("_",
-                                                                                                     "") == normalized_name.replace(
-                                                    "-", "").replace("_", ""):
-                                                success = await add_channel_to_exclusions(server_id,
-                                                                                          str(channel_data["id"]),
-                                                                                          token)
-                                                if success:
-                                                    logging.info(
-                                                        f"✅ Blocked channel {channel_data['name']} (ID: {channel_data['id']}) in server {server_id}")
-                                                    return True
+                        session = await get_http_session()
+                        async with session.get(url, headers=headers) as response:
+                            if response.status == 200:
+                                channels = await response.json()
+
+                                for channel_data in channels:
+                                    if channel_data.get("type") == 0:  # Text channel
+                                        if channel_data["name"].lower().replace("-", "").replace("_",
+                                                                                                 "") == normalized_name.replace(
+                                                "-", "").replace("_", ""):
+                                            success = await add_channel_to_exclusions(server_id,
+                                                                                      str(channel_data["id"]),
+                                                                                      token)
+                                            if success:
+                                                logging.info(
+                                                    f"✅ Blocked channel {channel_data['name']} (ID: {channel_data['id']}) in server {server_id}")
+                                                return True
                     except Exception as e:
                         logging.error(f"❌ Error checking server {server_id}: {e}")
                         continue
@@ -543,7 +571,7 @@ async def process_redis_messages():
                     break
 
                 try:
-                    message = json.loads(message_data)
+                    message = _loads(message_data)
                     if not isinstance(message, dict):
                         raise ValueError("Invalid message format, expected dict")
                     if "message_id" not in message:
@@ -767,67 +795,67 @@ async def send_dm_via_webhook(webhook, message_data):
         files = []
         for idx, url in enumerate(attachments):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as resp:
-                        if resp.status == 200:
-                            file_data = await resp.read()
-                            filename = url.split("/")[-1].split("?")[0] or f"file{idx}.jpg"
+                session = await get_http_session()
+                async with session.get(url) as resp:
+                    if resp.status == 200:
+                        file_data = await resp.read()
+                        filename = url.split("/")[-1].split("?")[0] or f"file{idx}.jpg"
 
-                            if len(file_data) <= MAX_DISCORD_FILE_SIZE:
+                        if len(file_data) <= MAX_DISCORD_FILE_SIZE:
+                            files.append({
+                                "filename": filename,
+                                "data": file_data
+                            })
+                        else:
+                            # Try to compress the image before giving up
+                            compressed_data, compressed_filename, was_compressed = compress_image(file_data, filename)
+                            if was_compressed and len(compressed_data) <= MAX_DISCORD_FILE_SIZE:
                                 files.append({
-                                    "filename": filename,
-                                    "data": file_data
+                                    "filename": compressed_filename,
+                                    "data": compressed_data
                                 })
+                                logging.info(f"✅ Large DM file compressed and attached: {compressed_filename}")
                             else:
-                                # Try to compress the image before giving up
-                                compressed_data, compressed_filename, was_compressed = compress_image(file_data, filename)
-                                if was_compressed and len(compressed_data) <= MAX_DISCORD_FILE_SIZE:
-                                    files.append({
-                                        "filename": compressed_filename,
-                                        "data": compressed_data
-                                    })
-                                    logging.info(f"✅ Large DM file compressed and attached: {compressed_filename}")
+                                # Still too large or not an image, send as link
+                                logging.warning(f"⚠️ DM file too large even after compression, sending as link: {filename}")
+                                if content:
+                                    payload["content"] = f"{content}\n📎 **Large file:** {url}"
                                 else:
-                                    # Still too large or not an image, send as link
-                                    logging.warning(f"⚠️ DM file too large even after compression, sending as link: {filename}")
-                                    if content:
-                                        payload["content"] = f"{content}\n📎 **Large file:** {url}"
-                                    else:
-                                        payload["content"] = f"📎 **Large file:** {url}"
+                                    payload["content"] = f"📎 **Large file:** {url}"
             except Exception as e:
                 logging.warning(f"⚠️ Failed to fetch attachment: {url} → {e}")
 
         # Send via webhook
-        async with aiohttp.ClientSession() as session:
-            try:
-                if files:
-                    from aiohttp import FormData
-                    form = FormData()
-                    for idx, file in enumerate(files):
-                        form.add_field(
-                            name=f"file{idx}",
-                            value=file["data"],
-                            filename=file["filename"],
-                            content_type="application/octet-stream"
-                        )
-                    form.add_field("payload_json", json.dumps(payload))
-
-                    async with session.post(webhook.url, data=form) as response:
-                        if response.status in (200, 204):
-                            logging.info(f"✅ DM webhook message sent successfully")
-                        else:
-                            error = await response.text()
-                            logging.error(f"❌ DM webhook file upload failed ({response.status}) → {error}")
-                else:
-                    async with session.post(webhook.url, json=payload) as response:
-                        if response.status in (200, 204):
-                            logging.info(f"✅ DM webhook message sent successfully")
-                        else:
-                            error = await response.text()
-                            logging.error(f"❌ DM webhook failed ({response.status}) → {error}")
+        session = await get_http_session()
+        try:
+            if files:
+                from aiohttp import FormData
+                form = FormData()
+                for idx, file in enumerate(files):
+                    form.add_field(
+                        name=f"file{idx}",
+                        value=file["data"],
+                        filename=file["filename"],
+                        content_type="application/octet-stream"
+                    )
+                form.add_field("payload_json", json.dumps(payload))
+
+                async with session.post(webhook.url, data=form) as response:
+                    if response.status in (200, 204):
+                        logging.info(f"✅ DM webhook message sent successfully")
+                    else:
+                        error = await response.text()
+                        logging.error(f"❌ DM webhook file upload failed ({response.status}) → {error}")
+            else:
+                async with session.post(webhook.url, json=payload) as response:
+                    if response.status in (200, 204):
+                        logging.info(f"✅ DM webhook message sent successfully")
+                    else:
+                        error = await response.text()
+                        logging.error(f"❌ DM webhook failed ({response.status}) → {error}")
 
-            except Exception as e:
-                logging.error(f"❌ Exception during DM webhook post: {e}")
+        except Exception as e:
+            logging.error(f"❌ Exception during DM webhook post: {e}")
 
     except Exception as e:
         logging.error(f"❌ Error in send_dm_via_webhook: {e}")
@@ -988,10 +1016,12 @@ async def relay_message_to_dm(channel, message):
 
         # Add timeout and better error handling
         timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        # main.py is on the same host; use its Unix socket when configured
+        connector = aiohttp.UnixConnector(path=DM_RELAY_UNIX_SOCKET) if DM_RELAY_UNIX_SOCKET else None
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
             try:
                 logging.info(f"🔗 Sending request to DM relay service...")
-                async with session.post("http://127.0.0.1:5001/send_dm", json=relay_data) as response:
+                async with session.post(dm_relay_endpoint, json=relay_data) as response:
                     response_text = await response.text()
                     logging.info(f"📡 DM relay service response: {response.status} - {response_text}")
 
@@ -1301,167 +1331,167 @@ async def send_to_webhook(message_data):
     files = []
     for idx, url in enumerate(attachments):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        file_data = await resp.read()
-                        filename = url.split("/")[-1].split("?")[0] or f"file{idx}.jpg"
-
-                        if len(file_data) <= MAX_DISCORD_FILE_SIZE:
+            session = await get_http_session()
+            async with session.get(url) as resp:
+                if resp.status == 200:
+                    file_data = await resp.read()
+                    filename = url.split("/")[-1].split("?")[0] or f"file{idx}.jpg"
+
+                    if len(file_data) <= MAX_DISCORD_FILE_SIZE:
+                        files.append({
+                            "filename": filename,
+                            "data": file_data
+                        })
+                    else:
+                        # Try to compress the image before giving up
+                        compressed_data, compressed_filename, was_compressed = compress_image(file_data, filename)
+                        if was_compressed and len(compressed_data) <= MAX_DISCORD_FILE_SIZE:
                             files.append({
-                                "filename": filename,
-                                "data": file_data
+                                "filename": compressed_filename,
+                                "data": compressed_data
                             })
+                            logging.info(f"✅ Large file compressed and attached: {compressed_filename}")
                         else:
-                            # Try to compress the image before giving up
-                            compressed_data, compressed_filename, was_compressed = compress_image(file_data, filename)
-                            if was_compressed and len(compressed_data) <= MAX_DISCORD_FILE_SIZE:
-                                files.append({
-                                    "filename": compressed_filename,
-                                    "data": compressed_data
-                                })
-                                logging.info(f"✅ Large file compressed and attached: {compressed_filename}")
-                            else:
-                                # Still too large or not an image, send as link in content
-                                logging.warning(f"⚠️ File too large even after compression, adding link to content: {filename}")
-                                content_parts[0] = f"{content_parts[0]}\n📎 **Large file:** {url}" if content_parts[0] else f"📎 **Large file:** {url}"
+                            # Still too large or not an image, send as link in content
+                            logging.warning(f"⚠️ File too large even after compression, adding link to content: {filename}")
+                            content_parts[0] = f"{content_parts[0]}\n📎 **Large file:** {url}" if content_parts[0] else f"📎 **Large file:** {url}"
         except Exception as e:
             logging.warning(f"⚠️ Failed to fetch attachment: {url} → {e}")
 
     # Send webhook with enhanced error handling
-    async with aiohttp.ClientSession() as session:
-        for part_idx, part in enumerate(content_parts):
-            success = False
-            for attempt in range(3):
-                try:
-                    avatar_url = message_data.get("author_avatar")
-                    username = message_data.get("author_name", "Unknown")
-
-                    payload = {
-                        "username": username,
-                        "avatar_url": avatar_url
-                    }
-
-                    if part:
-                        payload["content"] = part
-
-                    if part_idx == 0 and cleaned_embeds:
-                        payload["embeds"] = cleaned_embeds
-
-                    files_to_send = files if part_idx == 0 else None
-
-                    if files_to_send:
-                        from aiohttp import FormData
-                        form = FormData()
-                        for idx, file in enumerate(files_to_send):
-                            form.add_field(
-                                name=f"file{idx}",
-                                value=file["data"],
-                                filename=file["filename"],
-                                content_type="application/octet-stream"
-                            )
-                        form.add_field("payload_json", json.dumps(payload))
-
-                        async with session.post(webhook_url, data=form) as response:
-                            if response.status in (200, 204):
-                                success = True
-                                break
-                            elif response.status == 429:
-                                error_data = await response.json()
-                                retry_after = error_data.get("retry_after", 1)
-                                await asyncio.sleep(retry_after)
-                                continue
-                            elif response.status == 404:
-                                error_data = await response.text()
-                                if "Unknown Webhook" in error_data:
-                                    logging.info(f"Unknown webhook detected for {webhook_key}, removing from config")
-                                    WEBHOOKS.pop(webhook_key, None)
-                                    redis_client.hdel("webhooks", webhook_key)
-                                    bot.save_config()
-                                    return
-                                else:
-                                    logging.error(f"❌ Webhook 404: {error_data}")
-                                    return
-                            elif response.status == 413:
-                                logging.info(f"Request too large for webhook, skipping message")
+    session = await get_http_session()
+    for part_idx, part in enumerate(content_parts):
+        success = False
+        for attempt in range(3):
+            try:
+                avatar_url = message_data.get("author_avatar")
+                username = message_data.get("author_name", "Unknown")
+
+                payload = {
+                    "username": username,
+                    "avatar_url": avatar_url
+                }
+
+                if part:
+                    payload["content"] = part
+
+                if part_idx == 0 and cleaned_embeds:
+                    payload["embeds"] = cleaned_embeds
+
+                files_to_send = files if part_idx == 0 else None
+
+                if files_to_send:
+                    from aiohttp import FormData
+                    form = FormData()
+                    for idx, file in enumerate(files_to_send):
+                        form.add_field(
+                            name=f"file{idx}",
+                            value=file["data"],
+                            filename=file["filename"],
+                            content_type="application/octet-stream"
+                        )
+                    form.add_field("payload_json", json.dumps(payload))
+
+                    async with session.post(webhook_url, data=form) as response:
+                        if response.status in (200, 204):
+                            success = True
+                            break
+                        elif response.status == 429:
+                            error_data = await response.json()
+                            retry_after = error_data.get("retry_after", 1)
+                            await asyncio.sleep(retry_after)
+                            continue
+                        elif response.status == 404:
+                            error_data = await response.text()
+                            if "Unknown Webhook" in error_data:
+                                logging.info(f"Unknown webhook detected for {webhook_key}, removing from config")
+                                WEBHOOKS.pop(webhook_key, None)
+                                redis_client.hdel("webhooks", webhook_key)
+                                bot.save_config()
                                 return
-                            elif response.status == 400:
-                                error_data = await response.text()
-                                if "30005" in error_data:  # Role limit error
-                                    logging.error(f"❌ Role limit reached, message skipped")
-                                    return
-                                else:
-                                    logging.error(f"❌ Bad request: {error_data}")
-                                    return
                             else:
-                                error = await response.text()
-                                logging.error(f"❌ Webhook failed ({response.status}): {error}")
+                                logging.error(f"❌ Webhook 404: {error_data}")
                                 return
-                    else:
-                        async with session.post(webhook_url, json=payload) as response:
-                            if response.status in (200, 204):
-                                success = True
-                                break
-                            elif response.status == 429:
-                                error_data = await response.json()
-                                retry_after = error_data.get("retry_after", 1)
-                                await asyncio.sleep(retry_after)
-                                continue
-                            elif response.status == 404:
-                                error_data = await response.text()
-                                if "Unknown Webhook" in error_data:
-                                    logging.info(f"Unknown webhook detected for {webhook_key}, removing from config")
-                                    WEBHOOKS.pop(webhook_key, None)
-                                    redis_client.hdel("webhooks", webhook_key)
-                                    bot.save_config()
-                                    return
-                                else:
-                                    logging.error(f"❌ Webhook 404: {error_data}")
-                                    return
-                            elif response.status == 413:
-                                logging.info(f"Request too large for webhook, skipping message")
+                        elif response.status == 413:
+                            logging.info(f"Request too large for webhook, skipping message")
+                            return
+                        elif response.status == 400:
+                            error_data = await response.text()
+                            if "30005" in error_data:  # Role limit error
+                                logging.error(f"❌ Role limit reached, message skipped")
                                 return
-                            elif response.status == 400:
-                                error_data = await response.text()
-                                if "30005" in error_data:  # Role limit error
-                                    logging.error(f"❌ Role limit reached, message skipped")
-                                    return
-                                elif "Must be 2000 or fewer in length" in error_data:
-                                    if len(payload.get("content", "")) > 1900:
-                                        payload["content"] = payload["content"][:1900] + "..."
-                                        continue
-                                else:
-                                    logging.error(f"❌ Bad request: {error_data}")
-                                    return
                             else:
-                                error = await response.text()
-                                logging.error(f"❌ Webhook failed ({response.status}): {error}")
+                                logging.error(f"❌ Bad request: {error_data}")
+                                return
+                        else:
+                            error = await response.text()
+                            logging.error(f"❌ Webhook failed ({response.status}): {error}")
+                            return
+                else:
+                    async with session.post(webhook_url, json=payload) as response:
+                        if response.status in (200, 204):
+                            success = True
+                            break
+                        elif response.status == 429:
+                            error_data = await response.json()
+                            retry_after = error_data.get("retry_after", 1)
+                            await asyncio.sleep(retry_after)
+                            continue
+                        elif response.status == 404:
+                            error_data = await response.text()
+                            if "Unknown Webhook" in error_data:
+                                logging.info(f"Unknown webhook detected for {webhook_key}, removing from config")
+                                WEBHOOKS.pop(webhook_key, None)
+                                redis_client.hdel("webhooks", webhook_key)
+                                bot.save_config()
+                                return
+                            else:
+                                logging.error(f"❌ Webhook 404: {error_data}")
+                                return
+                        elif response.status == 413:
+                            logging.info(f"Request too large for webhook, skipping message")
+                            return
+                        elif response.status == 400:
+                            error_data = await response.text()
+                            if "30005" in error_data:  # Role limit error
+                                logging.error(f"❌ Role limit reached, message skipped")
+                                return
+                            elif "Must be 2000 or fewer in length" in error_data:
+                                if len(payload.get("content", "")) > 1900:
+                                    payload["content"] = payload["content"][:1900] + "..."
+                                    continue
+                            else:
+                                logging.error(f"❌ Bad request: {error_data}")
                                 return
+                        else:
+                            error = await response.text()
+                            logging.error(f"❌ Webhook failed ({response.status}): {error}")
+                            return
 
-                except Exception as e:
-                    # Only log connection-related errors if we haven't logged them recently
-                    if "Server disconnected" in str(e) or "getaddrinfo failed" in str(e) or "semaphore timeout" in str(
-                            e).lower():
-                        if not connection_state["last_disconnect_logged"]:
-                            print("🔴 Disconnected from Discord")
-                            connection_state["last_disconnect_logged"] = True
-                            connection_state["is_connected"] = False
-                    else:
-                        logging.error(f"❌ Exception during webhook attempt {attempt + 1}: {e}")
+            except Exception as e:
+                # Only log connection-related errors if we haven't logged them recently
+                if "Server disconnected" in str(e) or "getaddrinfo failed" in str(e) or "semaphore timeout" in str(
+                        e).lower():
+                    if not connection_state["last_disconnect_logged"]:
+                        print("🔴 Disconnected from Discord")
+                        connection_state["last_disconnect_logged"] = True
+                        connection_state["is_connected"] = False
+                else:
+                    logging.error(f"❌ Exception during webhook attempt {attempt + 1}: {e}")
 
-                    if attempt < 2:
-                        await asyncio.sleep(2 * (attempt + 1))
+                if attempt < 2:
+                    await asyncio.sleep(2 * (attempt + 1))
 
-            if not success:
-                # Only log major failures, not routine network issues
-                try:
-                    if not any(keyword in str(e).lower() for keyword in ["timeout", "connection", "dns", "ssl"]):
-                        logging.error(f"❌ Failed to send webhook message part {part_idx + 1}")
-                except:
+        if not success:
+            # Only log major failures, not routine network issues
+            try:
+                if not any(keyword in str(e).lower() for keyword in ["timeout", "connection", "dns", "ssl"]):
                     logging.error(f"❌ Failed to send webhook message part {part_idx + 1}")
+            except:
+                logging.error(f"❌ Failed to send webhook message part {part_idx + 1}")
 
-            if len(content_parts) > 1 and part_idx < len(content_parts) - 1:
-                await asyncio.sleep(0.5)
+        if len(content_parts) > 1 and part_idx < len(content_parts) - 1:
+            await asyncio.sleep(0.5)
 
 async def handle_webhook_error(self, response, webhook_key, category_name, channel_name, server_name):
     """Handle webhook errors more gracefully"""
@@ -2004,7 +2034,7 @@ class DestinationBot(commands.Bot):
         """Delete destination channel if the corresponding source channel no longer exists."""
         try:
             # Make an API call to Discord to check if the source channel still exists
-            session = aiohttp.ClientSession()
+            session = await get_http_session()
             headers = {
                 "Authorization": f"Bot {BOT_TOKEN}",
                 "Content-Type": "application/json"
@@ -2026,8 +2056,6 @@ class DestinationBot(commands.Bot):
                         f"⚠️ Unexpected status checking source channel {source_channel_id}: {response.status} {error_text}")
         except Exception as e:
             logging.error(f"❌ Error while checking/deleting destination channel: {e}")
-        finally:
-            await session.close()
 
     async def monitor_deleted_channels(self):
         await self.wait_until_ready()
@@ -2255,21 +2283,96 @@ async def create_channel_and_webhook(category_name, channel_name, server_name):
     return None
 
 
+# Deletions run off the request path; hold references so the tasks are not garbage collected
+_channel_delete_tasks = set()
+
+
+async def delete_mirrored_channel(data):
+    """Delete the mirror of a source channel that main.py reported as deleted."""
+    category_name = data.get("category_name", "uncategorized").strip().lower().replace(" ", "-").replace("|", "")
+    server_name = data.get("server_name", "Unknown Server").strip().lower().replace(" ", "-").replace("|", "")
+    channel_name = data.get("channel_name", "").strip().lower().replace(" ", "-").replace("|", "")
+
+    # Same key send_to_webhook uses for this channel
+    webhook_key = f"{category_name}-[{server_name}]/{channel_name}"
+    webhook_url = WEBHOOKS.get(webhook_key)
+    if not webhook_url:
+        logging.info(f"ℹ️ No mirrored channel for deleted source channel {webhook_key}")
+        return
+
+    try:
+        webhook_id = int(webhook_url.rstrip("/").split("/")[-2])
+        webhook = await bot.fetch_webhook(webhook_id)
+        channel = bot.get_channel(webhook.channel_id)
+        if channel is None or channel.guild.id != DESTINATION_SERVER_ID:
+            return
+
+        config_data = load_config()
+        if channel.id in config_data.get("protected_channels", []):
+            logging.info(f"🛡️ Skipping deletion of protected channel: {channel.name}")
+            return
+
+        await channel.delete(reason="Source channel deleted")
+        logging.info(f"🗑️ Deleted mirrored channel {channel.name} for {webhook_key}")
+    except discord.NotFound:
+        logging.info(f"ℹ️ Mirrored channel for {webhook_key} is already gone")
+    except Exception as e:
+        logging.error(f"❌ Failed to delete mirrored channel for {webhook_key}: {e}")
+        return
+
+    WEBHOOKS.pop(webhook_key, None)
+    redis_client.hdel("webhooks", webhook_key)
+
+
+def schedule_channel_delete(data):
+    task = asyncio.create_task(delete_mirrored_channel(data))
+    _channel_delete_tasks.add(task)
+    task.add_done_callback(_channel_delete_tasks.discard)
+
+
 async def process_message(request):
     try:
-        message_data = await request.json()
+        message_data = await request.json(loads=_loads)
         logging.info(f"📩 Received message: {message_data}")
-        redis_client.lpush("message_queue", json.dumps(message_data))
+        redis_client.lpush("message_queue", _dumps(message_data))
         return web.json_response({"status": "success", "message": "Message received"}, status=200)
     except Exception as e:
         logging.error(f"❌ ERROR: Failed to process message: {e}")
         return web.json_response({"status": "error", "message": str(e)}, status=500)
 
 
+async def process_batch(request):
+    """Accept a list of messages from main.py and queue them in one pipelined round-trip."""
+    try:
+        batch = await request.json(loads=_loads)
+    except Exception as e:
+        return web.json_response({"status": "error", "message": f"Invalid JSON: {e}"}, status=400)
+    if not isinstance(batch, list) or not all(isinstance(m, dict) for m in batch):
+        return web.json_response({"status": "error", "message": "Expected a list of messages"}, status=400)
+
+    try:
+        logging.info(f"📩 Received batch of {len(batch)} messages")
+        pipe = redis_client.pipeline(transaction=False)
+        queued = []
+        for i, message_data in enumerate(batch):
+            if message_data.get("action") == "delete_channel":
+                schedule_channel_delete(message_data)
+                continue
+            pipe.lpush("message_queue", _dumps(message_data))
+            queued.append(i)
+        results = pipe.execute(raise_on_error=False) if queued else []
+        # Report per-message failures (as batch indices) so main.py only retries those
+        failed = [i for i, result in zip(queued, results) if isinstance(result, Exception)]
+        return web.json_response({"status": "success", "failed": failed}, status=200)
+    except Exception as e:
+        logging.error(f"❌ ERROR: Failed to process batch: {e}")
+        return web.json_response({"status": "error", "message": str(e)}, status=500)
+
+
 async def process_dm_relay(request):
     """Handle DM relay requests from main.py."""
     try:
-        relay_data = await request.json()
+        relay_data = await request.json(loads=_loads)
         action = relay_data.get("action")
 
         if action == "send_dm":
@@ -2288,7 +2391,7 @@ async def process_dm_relay(request):
             }
 
             # Push to a specific Redis queue for DM relay
-            redis_client.lpush("dm_relay_queue", json.dumps(relay_request))
+            redis_client.lpush("dm_relay_queue", _dumps(relay_request))
             logging.info(f"✅ DM relay request queued for user {user_id}")
 
             return web.json_response({"status": "success", "message": "DM relay queued"}, status=200)
@@ -2303,22 +2406,34 @@ async def process_dm_relay(request):
 async def start_web_server():
     app = web.Application()
     app.router.add_post("/process_message", process_message)
-    runner = web.AppRunner(app)
+    app.router.add_post("/process_batch", process_batch)
+    # Handlers log what they need; skip aiohttp's per-request access log line
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, "127.0.0.1", 5000)
+    site = web.TCPSite(runner, "127.0.0.1", 5000, backlog=256)
     await site.start()
     logging.info("🌐 Web server started on http://127.0.0.1:5000")
 
+    # Optional Unix socket for a main.py on the same host (same variable main.py reads)
+    unix_socket = os.getenv("DESTINATION_UNIX_SOCKET")
+    if unix_socket:
+        unix_site = web.UnixSite(runner, unix_socket)
+        await unix_site.start()
+        logging.info(f"🌐 Web server also listening on unix:{unix_socket}")
+
 
 async def run_bot():
     bot.webhook_cache = redis_client.hgetall("webhooks")
 
     threading.Thread(target=schedule_cleanup, daemon=True).start()
 
-    await asyncio.gather(
-        bot.start(BOT_TOKEN),
-        start_web_server()
-    )
+    try:
+        await asyncio.gather(
+            bot.start(BOT_TOKEN),
+            start_web_server()
+        )
+    finally:
+        await close_http_session()
 
 
 bot = DestinationBot()
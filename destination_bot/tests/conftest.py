@@ -0,0 +1,21 @@
+import json
+import os
+import sys
+import tempfile
+
+# bot.py parses sys.argv and reads config.json from the working directory at import time,
+# so import it once from a scratch directory holding a minimal config
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+_workdir = tempfile.mkdtemp(prefix="destination-bot-tests-")
+with open(os.path.join(_workdir, "config.json"), "w", encoding="utf-8") as f:
+    json.dump({"destination_server": 1, "webhooks": {}}, f)
+os.chdir(_workdir)
+
+_argv = sys.argv
+sys.argv = ["bot.py"]
+try:
+    import bot  # noqa: E402,F401
+finally:
+    sys.argv = _argv
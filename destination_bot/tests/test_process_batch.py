@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+import bot
+
+
+class FakeRequest:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self, loads):
+        return loads(self.body)
+
+
+class FakePipeline:
+    def __init__(self, results):
+        self.results = results
+        self.pushed = []
+
+    def lpush(self, key, value):
+        self.pushed.append((key, json.loads(value)))
+
+    def execute(self, raise_on_error=True):
+        return self.results[:len(self.pushed)]
+
+
+class FakeRedis:
+    def __init__(self, results):
+        self.pipe = FakePipeline(results)
+
+    def pipeline(self, transaction=True):
+        return self.pipe
+
+
+@pytest.fixture
+def redis_results(monkeypatch):
+    """Return a function that installs a fake Redis whose pipeline returns the given results."""
+    def install(results):
+        fake = FakeRedis(results)
+        monkeypatch.setattr(bot, "redis_client", fake)
+        return fake.pipe
+
+    return install
+
+
+@pytest.fixture
+def deletions(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(bot, "schedule_channel_delete", scheduled.append)
+    return scheduled
+
+
+def call(body):
+    response = asyncio.run(bot.process_batch(FakeRequest(body)))
+    return response.status, json.loads(response.body)
+
+
+def test_process_batch_queues_every_message(redis_results):
+    pipe = redis_results([1, 2, 3])
+    batch = [{"message_id": str(i)} for i in range(3)]
+
+    status, body = call(json.dumps(batch))
+
+    assert status == 200
+    assert body == {"status": "success", "failed": []}
+    assert pipe.pushed == [("message_queue", message) for message in batch]
+
+
+def test_process_batch_reports_failed_indices(redis_results):
+    redis_results([1, Exception("OOM"), 3])
+
+    status, body = call(json.dumps([{"message_id": str(i)} for i in range(3)]))
+
+    assert status == 200
+    assert body["failed"] == [1]
+
+
+def test_process_batch_routes_channel_deletes(redis_results, deletions):
+    pipe = redis_results([1, Exception("OOM")])
+    delete = {"action": "delete_channel", "channel_name": "5-12-drops"}
+
+    status, body = call(json.dumps([{"message_id": "a"}, delete, {"message_id": "b"}]))
+
+    assert status == 200
+    # Indices refer to the original batch, skipping the delete event
+    assert body["failed"] == [2]
+    assert deletions == [delete]
+    assert [message["message_id"] for _, message in pipe.pushed] == ["a", "b"]
+
+
+@pytest.mark.parametrize("payload", [
+    "not json",
+    json.dumps({"message_id": "a"}),
+    json.dumps([{"message_id": "a"}, "b"]),
+])
+def test_process_batch_rejects_malformed_batches(redis_results, payload):
+    pipe = redis_results([])
+
+    status, body = call(payload)
+
+    assert status == 400
+    assert body["status"] == "error"
+    assert pipe.pushed == []
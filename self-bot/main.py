@@ -1,15 +1,24 @@
 import discord
-import json
+import orjson
 import os
 import aiohttp
 import asyncio
+import ctypes
 import logging
-import redis
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import redis.asyncio as aioredis
 import hashlib
 import traceback
 import signal
 import re
+import struct
+import random
+import sys
 import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 from watchdog.observers import Observer
@@ -32,86 +41,189 @@ if not os.path.exists("logs"):
 # Generate log filename with date and time
 log_filename = datetime.now().strftime("logs/main_%Y-%m-%d_%H-%M-%S.log")
 
-# Configure basic logging as fallback
-logging.basicConfig(
-    filename=log_filename,
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+# Configure basic logging as fallback. Records are handed to a queue and written
+# by a background listener thread so file and console I/O never block the event loop.
+log_formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+file_handler = logging.FileHandler(log_filename)
+file_handler.setFormatter(log_formatter)
 
 # Configure console to only show errors
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.ERROR)
-console_formatter = logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
-console_handler.setFormatter(console_formatter)
-logging.getLogger().addHandler(console_handler)
+console_handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+logger = logging.getLogger(__name__)
+# No formatter uses thread or process fields, so don't look them up for every record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 # Enhanced logging function using structured logger
 def log_message(message, **kwargs):
     structured_logger.info(message, **kwargs)
 
 
-# Connect to Redis
-redis_client = redis.Redis(host="localhost", port=6379, db=0)
-
 # Load environment variables
 load_dotenv()
 
+# Connect to Redis (prefer the Unix socket when Redis runs on the same host)
+REDIS_UNIX_SOCKET = os.getenv("REDIS_UNIX_SOCKET")  # e.g. /var/run/redis/redis.sock
+if REDIS_UNIX_SOCKET:
+    redis_client = aioredis.Redis(unix_socket_path=REDIS_UNIX_SOCKET, db=0, max_connections=32)
+else:
+    redis_client = aioredis.Redis(host="localhost", port=6379, db=0, max_connections=32)
+
+_UTC = timezone.utc
+
 # Load configuration
 CONFIG_FILE = "config.json"
 
 
 def load_config():
-    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(CONFIG_FILE, "rb") as f:
+        return orjson.loads(f.read())
 
 
-def save_config(config_data):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(config_data, f, indent=4)
+_last_self_write_mtime = None  # mtime of our own last write, so the watcher can ignore it
+
+
+def write_config_file(payload):
+    """Atomically replace config.json with `payload` and remember the resulting mtime."""
+    global _last_self_write_mtime
+    tmp_file = CONFIG_FILE + ".tmp"
+    # Held so a reload never parses a half-written file and the mtime matches this write
+    with config_lock:
+        with open(tmp_file, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_file, CONFIG_FILE)
+        _last_self_write_mtime = os.stat(CONFIG_FILE).st_mtime_ns
 
 
 config = load_config()
 
+# Runtime changes (login info, failed tokens) mutate `config` in place and are
+# written back by a single coalesced save a couple of seconds later
+CONFIG_SAVE_DELAY = 2.0
+_config_save_handle = None
+_config_flush_task = None  # referenced so the loop can't garbage-collect it mid-write
+
+
+def schedule_config_save():
+    """Persist `config` soon, coalescing bursts of changes into one write; must be called from the running loop."""
+    global _config_save_handle
+    if _config_save_handle is None:
+        _config_save_handle = asyncio.get_running_loop().call_later(CONFIG_SAVE_DELAY, start_config_flush)
+
+
+def start_config_flush():
+    """Run flush_config as a tracked task (the scheduled save's timer callback)."""
+    global _config_flush_task
+    _config_flush_task = asyncio.create_task(flush_config())
+    _config_flush_task.add_done_callback(config_flush_done)
+
+
+def config_flush_done(task):
+    global _config_flush_task
+    if _config_flush_task is task:
+        _config_flush_task = None
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("❌ Failed to save config.json: %s", task.exception())
+
+
+async def flush_config():
+    """Write `config` now, cancelling any pending scheduled save. The disk write runs in the default executor."""
+    global _config_save_handle
+    if _config_save_handle is not None:
+        _config_save_handle.cancel()
+        _config_save_handle = None
+    # Encode on the loop so the worker thread never sees `config` mid-mutation
+    payload = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    await asyncio.get_running_loop().run_in_executor(None, write_config_file, payload)
+
+
 TOKENS = config["tokens"]
 DESTINATION_SERVERS = config.get("destination_servers", {})
 EXCLUDED_CATEGORIES = set(config.get("excluded_categories", []))  # Ensure valid set
 WEBHOOKS = config.get("webhooks", {})
 MESSAGE_DELAY = config["settings"].get("message_delay", 0.75)  # Default to 0.75s delay
-DESTINATION_BOT_URL = "http://127.0.0.1:5000/process_message"  # Change if bot.py is remote
+DESTINATION_BATCH_URL = "http://127.0.0.1:5000/process_batch"  # Change if bot.py is remote
+# When bot.py runs on the same host it can also listen on a Unix socket; the URLs'
+# host part is then ignored and every POST skips the TCP loopback stack
+DESTINATION_UNIX_SOCKET = os.getenv("DESTINATION_UNIX_SOCKET")  # e.g. /tmp/1tap_bot.sock
+DM_RELAY_UNIX_SOCKET = os.getenv("DM_RELAY_UNIX_SOCKET")  # e.g. /tmp/1tap_dm_relay.sock
 MAX_LOGIN_ATTEMPTS = config["settings"].get("max_login_attempts", 3)  # Add this setting
 
+# Failed POSTs to bot.py are parked in a Redis sorted set scored by next retry time
+RETRY_QUEUE = "dlq_messages"
+RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 10.0
+RETRY_MAX_ATTEMPTS = 8  # dropped (and counted) after this many failed retries
+RETRY_JITTER = 1.0
+
+# Messages pushed to Redis are coalesced into pipelined batches
+REDIS_BATCH_SIZE = 100
+REDIS_FLUSH_INTERVAL = 0.05  # seconds to wait for a batch to fill
+MESSAGE_QUEUE_MAXLEN = 100000  # message_queue is trimmed to the newest entries past this
+
+# Messages forwarded to bot.py are coalesced into POSTs to /process_batch
+HTTP_BATCH_SIZE = 50
+# Upper bound on messages waiting for either flusher, so a stalled Redis or bot.py can't exhaust memory
+DISPATCH_QUEUE_SIZE = 10000
+DROP_WARNING_INTERVAL = 10.0  # seconds between "queue full" warnings while messages are being dropped
+DISPATCH_CLOSE_TIMEOUT = 15.0  # seconds shutdown waits for the flushers to drain
+HTTP_FLUSH_INTERVAL = 0.025
+JSON_HEADERS = {"Content-Type": "application/json"}  # payloads are pre-encoded with orjson
+MAX_CONCURRENT_POSTS = 32  # enforced by the shared session's connector pool
+LARGE_PAYLOAD_BYTES = 8192  # estimated size above which encoding moves off the event loop
+POST_TIMEOUT = aiohttp.ClientTimeout(total=5)  # so a stuck bot.py can't hold a connection forever
+USER_CACHE_TTL = 300  # seconds a fetched DM recipient is reused
+USER_NOT_FOUND_TTL = 60  # seconds an unknown user id is remembered
+USER_CACHE_SIZE = 4096  # the per-bot user cache is reset when it reaches this size
+
 # Global variables to track active bots for dynamic reloading
 active_bots = {}  # Dictionary to store active bot instances
 config_lock = threading.Lock()  # Thread lock for config updates
-config_reload_flag = False  # Flag to signal config reload needed
 server_name_cache = {}  # Cache for server names to avoid repeated API calls
 
+CONFIG_DEBOUNCE_NS = 300_000_000  # 300ms
+
+
 class ConfigFileHandler(FileSystemEventHandler):
     """Handle config.json file changes and reload configuration dynamically."""
     
-    def __init__(self):
+    def __init__(self, loop, reload_event):
         super().__init__()
-        self.last_modified = 0
+        self.loop = loop
+        self.reload_event = reload_event
+        self.last_modified_ns = 0
     
     def on_modified(self, event):
         if not event.is_directory and event.src_path.endswith('config.json'):
-            # Debounce file changes (avoid multiple triggers)
-            current_time = datetime.now().timestamp()
-            if current_time - self.last_modified < 1:  # 1 second debounce
+            # Ignore the change our own write_config_file just made
+            try:
+                if os.stat(event.src_path).st_mtime_ns == _last_self_write_mtime:
+                    return
+            except OSError:
+                return
+
+            # Debounce file changes (editors often write several times per save)
+            current_time = time.monotonic_ns()
+            if current_time - self.last_modified_ns < CONFIG_DEBOUNCE_NS:
                 return
-            self.last_modified = current_time
+            self.last_modified_ns = current_time
             
             structured_logger.info("Config file changed - reloading configuration")
             print("\n📝 Config file changed - reloading configuration...")
-            # Set flag for main loop to handle config reload
-            global config_reload_flag
-            config_reload_flag = True
+            # Watchdog calls us from its own thread; wake the main loop safely
+            self.loop.call_soon_threadsafe(self.reload_event.set)
 
 async def reload_config_dynamically():
     """Reload config and update active bots with new exclusions."""
-    global TOKENS, EXCLUDED_CATEGORIES, MESSAGE_DELAY, MAX_LOGIN_ATTEMPTS, server_name_cache
+    global config, TOKENS, EXCLUDED_CATEGORIES, MESSAGE_DELAY, MAX_LOGIN_ATTEMPTS, server_name_cache
     
     try:
         with config_lock:
@@ -122,18 +234,20 @@ async def reload_config_dynamically():
             new_config = load_config()
             
             # Update global variables
+            config = new_config
             TOKENS = new_config["tokens"]
+            build_config_indexes()
             EXCLUDED_CATEGORIES = set(new_config.get("excluded_categories", []))
             MESSAGE_DELAY = new_config["settings"].get("message_delay", 0.75)
             MAX_LOGIN_ATTEMPTS = new_config["settings"].get("max_login_attempts", 3)
             
             # Update monitored servers for all active bots
-            new_monitored_servers = get_monitored_server_ids()
+            new_monitored_servers = MONITORED_SERVER_IDS
             
             for token, bot_instance in active_bots.items():
                 if hasattr(bot_instance, 'monitored_servers'):
                     # Update the bot's monitored servers
-                    bot_instance.monitored_servers = {str(server_id) for server_id in new_monitored_servers}
+                    bot_instance.monitored_servers = parse_ids(new_monitored_servers, "server")
                     print(f"✅ Updated monitoring config for bot {token[:8]}***")
             
             structured_logger.info(
@@ -168,9 +282,95 @@ async def reload_config_dynamically():
         )
         print(f"❌ Failed to reload config: {e}")
 
-def start_config_watcher():
-    """Start watching config.json for changes."""
-    event_handler = ConfigFileHandler()
+class InotifyConfigWatcher:
+    """Watch config.json with inotify on the event loop itself (Linux only).
+
+    Watches the parent directory so atomic saves (write + os.replace) are seen,
+    and coalesces bursts of events into one reload 300ms after the last one.
+    Exposes stop()/join() so it can stand in for a watchdog Observer.
+    """
+
+    # inotify(7) constants
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    __slots__ = ("loop", "reload_event", "path", "filename", "reload_handle", "fd")
+
+    def __init__(self, loop, reload_event, path=CONFIG_FILE):
+        self.loop = loop
+        self.reload_event = reload_event
+        self.path = path
+        self.filename = os.fsencode(os.path.basename(path))
+        self.reload_handle = None
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.fsencode(os.path.dirname(os.path.abspath(path)))
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch failed")
+        loop.add_reader(self.fd, self.on_readable)
+
+    def on_readable(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        changed = False
+        while offset < len(data):
+            _, _, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            if data[offset:offset + name_len].rstrip(b"\0") == self.filename:
+                changed = True
+            offset += name_len
+        if changed:
+            # Trailing-edge debounce: editors often write several times per save
+            if self.reload_handle:
+                self.reload_handle.cancel()
+            self.reload_handle = self.loop.call_later(CONFIG_DEBOUNCE_NS / 1e9, self.trigger_reload)
+
+    def trigger_reload(self):
+        self.reload_handle = None
+        # Ignore the change our own write_config_file just made
+        try:
+            if os.stat(self.path).st_mtime_ns == _last_self_write_mtime:
+                return
+        except OSError:
+            return
+        structured_logger.info("Config file changed - reloading configuration")
+        print("\n📝 Config file changed - reloading configuration...")
+        self.reload_event.set()
+
+    def stop(self):
+        if self.reload_handle:
+            self.reload_handle.cancel()
+            self.reload_handle = None
+        if self.fd >= 0:
+            self.loop.remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = -1
+
+    def join(self):
+        pass
+
+def start_config_watcher(loop, reload_event):
+    """Start watching config.json for changes; `reload_event` is set on the loop when it changes."""
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyConfigWatcher(loop, reload_event)
+            print("👀 Started watching config.json for changes (inotify)...")
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.warning("inotify unavailable (%s), falling back to watchdog", e)
+    event_handler = ConfigFileHandler(loop, reload_event)
     observer = Observer()
     observer.schedule(event_handler, path='.', recursive=False)
     observer.start()
@@ -180,52 +380,86 @@ def start_config_watcher():
 # Track failed tokens
 failed_tokens = set()
 
-def get_excluded_categories(server_id):
-    """Retrieve excluded categories for a given server from TOKENS data."""
-    for token_data in TOKENS.values():
-        if "servers" in token_data and server_id in token_data["servers"]:
-            return set(token_data["servers"][server_id].get("excluded_categories", []))
+_EMPTY = frozenset()
+_NO_EXCLUSIONS = (_EMPTY, _EMPTY)
+SERVER_INDEX = {}  # int server_id -> (excluded category ids, excluded channel ids), all ints
+TOKEN_BY_USER_ID = {}
+TOKEN_BY_USERNAME_LOWER = {}
+MONITORED_SERVER_IDS = frozenset()
+
+
+def index_user_info(token, user_info):
+    """Register a token's saved user info in the reverse lookups (first token seen wins)."""
+    if user_info.get("id"):
+        TOKEN_BY_USER_ID.setdefault(user_info["id"], token)
+    if user_info.get("name"):
+        TOKEN_BY_USERNAME_LOWER.setdefault(user_info["name"].lower(), token)
+
 
-    return set()  # Return an empty set if no excluded categories are found
+def parse_ids(ids, kind):
+    """Return config ids as a frozenset of ints, skipping (and warning about) non-numeric ones."""
+    parsed = set()
+    for raw_id in ids:
+        try:
+            parsed.add(int(raw_id))
+        except (TypeError, ValueError):
+            logger.warning("⚠️ Ignoring invalid %s id in config: %r", kind, raw_id)
+    return frozenset(parsed)
 
 
-def get_excluded_channels(server_id):
-    """Retrieve excluded channels for a given server from TOKENS data."""
+def build_config_indexes():
+    """Flatten TOKENS into O(1) lookup tables; rerun whenever TOKENS changes."""
+    global SERVER_INDEX, TOKEN_BY_USER_ID, TOKEN_BY_USERNAME_LOWER, MONITORED_SERVER_IDS
+    server_index = {}
     for token_data in TOKENS.values():
-        if "servers" in token_data and server_id in token_data["servers"]:
-            return set(token_data["servers"][server_id].get("excluded_channels", []))
-    return set()
+        for server_id, server_config in token_data.get("servers", {}).items():
+            try:
+                server_id = int(server_id)
+            except ValueError:
+                logger.warning("⚠️ Ignoring invalid server id in config: %r", server_id)
+                continue
+            # First token listing a server wins, as with the old per-message scan
+            if server_id not in server_index:
+                # Ints so lookups use the snowflakes on discord objects directly
+                server_index[server_id] = (
+                    parse_ids(server_config.get("excluded_categories", []), "category"),
+                    parse_ids(server_config.get("excluded_channels", []), "channel"),
+                )
+    SERVER_INDEX = server_index
+    MONITORED_SERVER_IDS = frozenset(server_index)
+
+    TOKEN_BY_USER_ID = {}
+    TOKEN_BY_USERNAME_LOWER = {}
+    for token, token_data in TOKENS.items():
+        index_user_info(token, token_data.get("user_info", {}))
+
+
+build_config_indexes()
+
+
+def get_server_exclusions(server_id):
+    """Return (excluded_categories, excluded_channels) for a server with a single lookup."""
+    return SERVER_INDEX.get(int(server_id), _NO_EXCLUSIONS)
+
+
+# Names of every guild any self-bot is in, kept current by guild events on the loop thread
+GUILD_NAME_INDEX = {}
 
 
 def get_server_info(server_id):
     """Retrieve human-readable server name from active bot instances or config.json."""
     server_id_str = str(server_id)
-    
+
+    server_name = GUILD_NAME_INDEX.get(server_id_str)
+    if server_name:
+        return server_name
+
     # Check cache first
     if server_id_str in server_name_cache:
         return server_name_cache[server_id_str]
     
-    server_name = None
-    
-    # First, try to get server name from active bot instances
-    try:
-        for bot_instance in active_bots.values():
-            if hasattr(bot_instance, 'guilds') and bot_instance.guilds:
-                for guild in bot_instance.guilds:
-                    if str(guild.id) == server_id_str:
-                        server_name = guild.name
-                        break
-            if server_name:
-                break
-    except Exception as e:
-        # Silently handle any errors accessing bot instances
-        pass
-    
     # Fallback to config.json destination servers info
-    if not server_name:
-        server_info = DESTINATION_SERVERS.get(server_id_str, {}).get("info")
-        if server_info:
-            server_name = server_info
+    server_name = DESTINATION_SERVERS.get(server_id_str, {}).get("info")
     
     # Final fallback
     if not server_name:
@@ -238,15 +472,15 @@ def get_server_info(server_id):
 
 def save_user_info(token, user_info):
     """Save user info to config for the given token."""
-    config = load_config()
     if token in config["tokens"]:
         config["tokens"][token]["user_info"] = {
             "id": str(user_info.id),
             "name": str(user_info),
             "discriminator": user_info.discriminator if hasattr(user_info, 'discriminator') else "0",
-            "last_successful_login": datetime.now(timezone.utc).isoformat()
+            "last_successful_login": datetime.now(_UTC).isoformat()
         }
-        save_config(config)
+        index_user_info(token, config["tokens"][token]["user_info"])
+        schedule_config_save()
         structured_logger.info(
             "Saved user info to config",
             user_id=str(user_info.id),
@@ -256,12 +490,11 @@ def save_user_info(token, user_info):
 
 def mark_token_as_failed(token, error_message):
     """Mark token as failed in config."""
-    config = load_config()
     if token in config["tokens"]:
         config["tokens"][token]["status"] = "failed"
         config["tokens"][token]["last_error"] = error_message
-        config["tokens"][token]["last_failed_attempt"] = datetime.now(timezone.utc).isoformat()
-        save_config(config)
+        config["tokens"][token]["last_failed_attempt"] = datetime.now(_UTC).isoformat()
+        schedule_config_save()
 
 
 def is_dm_mirroring_enabled(token):
@@ -278,40 +511,44 @@ def get_dm_destination_server(token):
     return dm_config.get("destination_server_id")
 
 
+# Channel names like "5-12-drops" or "3pm-restock" are short-lived and get deleted
+_STRIP_RE = re.compile(r'[^\w\s:-]')
+# Dates ("5-12") and times ("3pm") share a prefix, so one alternation scans the name once
+_TIME_OR_DATE_RE = re.compile(r'\b\d{1,2}(?:[-/]\d{1,2}|am|pm)\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def is_time_or_date_based(name):
+    """Classify a channel name; the result depends only on the name, so it is safe to memoize."""
+    if not any(c.isdigit() for c in name):
+        return False
+    clean_name = _STRIP_RE.sub('', name)
+    return _TIME_OR_DATE_RE.search(clean_name) is not None
+
+
+_USERNAME_STRIP_RE = re.compile(r'[^\w\s\-_]')
+_DASH_RUN_RE = re.compile(r'-+')
+
+
+@lru_cache(maxsize=2048)
 def normalize_username_for_channel(username):
     """Normalize a username to be safe for Discord channel names."""
-    # Remove emojis, special characters, and normalize
-    cleaned = re.sub(r'[^\w\s\-_]', '', username)
-    # Replace spaces with hyphens and convert to lowercase
-    cleaned = cleaned.replace(' ', '-').lower()
-    # Remove multiple consecutive hyphens
-    cleaned = re.sub(r'-+', '-', cleaned)
-    # Remove underscores and replace with hyphens
-    cleaned = cleaned.replace('_', '-')
-    # Ensure it starts and ends with alphanumeric
-    cleaned = cleaned.strip('-_')
-    # Ensure it's not empty
-    if not cleaned:
-        cleaned = "unknown-user"
-    return cleaned
+    # Remove emojis and special characters, replace spaces with hyphens and lowercase
+    cleaned = _USERNAME_STRIP_RE.sub('', username).replace(' ', '-').lower()
+    # Collapse consecutive hyphens, then turn underscores into hyphens
+    cleaned = _DASH_RUN_RE.sub('-', cleaned).replace('_', '-')
+    # Ensure it starts and ends with alphanumeric; never return an empty name
+    return cleaned.strip('-_') or "unknown-user"
 
 
 def find_token_for_user(target_user_id):
     """Find which token corresponds to a specific user ID."""
-    for token, token_data in TOKENS.items():
-        user_info = token_data.get("user_info", {})
-        if user_info.get("id") == str(target_user_id):
-            return token
-    return None
+    return TOKEN_BY_USER_ID.get(str(target_user_id))
 
 
 def find_token_by_username(username):
     """Find token by username (fallback method)."""
-    for token, token_data in TOKENS.items():
-        user_info = token_data.get("user_info", {})
-        if user_info.get("name", "").lower() == username.lower():
-            return token
-    return None
+    return TOKEN_BY_USERNAME_LOWER.get(username.lower())
 
 
 def get_user_display_name(user):
@@ -325,33 +562,38 @@ def get_user_display_name(user):
         return str(user).replace("#0", "")
 
 
+# Common spam indicators
+SPAM_KEYWORDS = (
+    "free", "money", "profit", "trading", "investment", "crypto", "bitcoin",
+    "earn", "daily", "guaranteed", "risk-free", "expert", "forex", "stocks",
+    "options", "mutual server", "click", "link", "http", "www", ".com",
+    "discord.gg", "join", "server", "community", "telegram", "@everyone",
+    "nitro", "gift", "giveaway", "winner", "congratulations", "claim",
+    "verify", "account", "suspended", "banned", "appeal", "support",
+    "official", "staff", "admin", "moderator", "team discord"
+)
+# A lookahead finds every keyword occurrence, overlapping ones included, in one pass.
+# No keyword is a prefix of another, so no match is shadowed at the same position.
+_SPAM_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, SPAM_KEYWORDS)) + "))")
+
+
 def is_spam_dm(message):
     """Check if a DM message appears to be spam."""
     content = message.content.lower()
 
-    # Common spam indicators
-    spam_keywords = [
-        "free", "money", "profit", "trading", "investment", "crypto", "bitcoin",
-        "earn", "daily", "guaranteed", "risk-free", "expert", "forex", "stocks",
-        "options", "mutual server", "click", "link", "http", "www", ".com",
-        "discord.gg", "join", "server", "community", "telegram", "@everyone",
-        "nitro", "gift", "giveaway", "winner", "congratulations", "claim",
-        "verify", "account", "suspended", "banned", "appeal", "support",
-        "official", "staff", "admin", "moderator", "team discord"
-    ]
-
-    # Check for spam keywords
-    spam_count = sum(1 for keyword in spam_keywords if keyword in content)
-    if spam_count >= 2:  # If 2 or more spam keywords
-        return True
+    # Check for spam keywords: 2 or more distinct ones
+    seen_keywords = set()
+    for match in _SPAM_KEYWORD_RE.finditer(content):
+        seen_keywords.add(match.group(1))
+        if len(seen_keywords) >= 2:
+            return True
 
     # Check for excessive links
     if content.count("http") > 1 or content.count(".com") > 1:
         return True
 
-    # Check for excessive emojis (spam often has many emojis)
-    emoji_count = len([char for char in content if ord(char) > 127])
-    if emoji_count > 10:
+    # Check for excessive emojis (spam often has many emojis); isascii() skips the count for plain text
+    if not content.isascii() and sum(1 for char in content if char > '\x7f') > 10:
         return True
 
     # Check message length patterns
@@ -378,7 +620,7 @@ def should_allow_dm(message):
     """Determine if a DM should be allowed through the filter."""
     # Always allow DMs from users in monitored servers
     for guild in message.author.mutual_guilds:
-        if str(guild.id) in get_monitored_server_ids():
+        if guild.id in MONITORED_SERVER_IDS:
             return True
 
     # Block spam messages
@@ -404,52 +646,326 @@ def should_allow_dm(message):
     return True
 
 
-def get_monitored_server_ids():
-    """Get all server IDs that are being monitored."""
-    monitored_servers = set()
-    for token_data in TOKENS.values():
-        if "servers" in token_data:
-            monitored_servers.update(token_data["servers"].keys())
-    return monitored_servers
+# Bots whose display name contains any of these may DM the self-bot
+ALLOWED_BOT_KEYWORDS = (
+    "zebra check",
+    "divine monitor",
+    "divine",
+    "hidden clearance bot",
+    "monitor",
+    "ticket tool",
+    "notification",
+    "alert",
+    "checker",
+    "1tap",
+    "sneaker",
+    "cook"
+)
+_ALLOWED_BOT_RE = re.compile("|".join(map(re.escape, ALLOWED_BOT_KEYWORDS)), re.IGNORECASE)
 
 
 def is_allowed_bot(user):
     """Check if this bot is allowed to send DMs."""
-    # List of allowed bot IDs or names
-    allowed_bots = [
-        "zebra check",
-        "divine monitor",
-        "divine",
-        "hidden clearance bot",
-        "monitor",
-        "ticket tool",
-        "notification",
-        "alert",
-        "checker",
-        "1tap",
-        "sneaker",
-        "cook"
-    ]
-
-    # Check if bot name contains allowed keywords
-    bot_name = user.display_name.lower() if user.display_name else str(user).lower()
-    for allowed in allowed_bots:
-        if allowed in bot_name:
-            return True
+    return _ALLOWED_BOT_RE.search(user.display_name or str(user)) is not None
 
-    return False
+
+# One process-wide HTTP session so every POST to bot.py reuses pooled keep-alive connections
+_HTTP_SESSION = None
+
+
+async def get_http_session():
+    """Return the shared aiohttp session, creating it inside the running loop on first use."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        # The pool size doubles as the cap on concurrent POSTs to bot.py
+        if DESTINATION_UNIX_SOCKET:
+            connector = aiohttp.UnixConnector(
+                path=DESTINATION_UNIX_SOCKET, limit=MAX_CONCURRENT_POSTS, keepalive_timeout=75
+            )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=MAX_CONCURRENT_POSTS, limit_per_host=MAX_CONCURRENT_POSTS, keepalive_timeout=75
+            )
+        _HTTP_SESSION = aiohttp.ClientSession(connector=connector)
+    return _HTTP_SESSION
+
+
+async def close_http_session():
+    """Close the shared aiohttp session if it was ever created."""
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+
+
+# Queued by Dispatcher.close() to tell a flusher to write what it has and exit
+_STOP = object()
+
+
+async def collect_batch(message_queue, max_size, interval):
+    """Wait for one item, then keep collecting until the batch is full, `interval` elapses or _STOP arrives."""
+    loop = asyncio.get_running_loop()
+    item = await message_queue.get()
+    batch = [item]
+    deadline = loop.time() + interval
+    while item is not _STOP and len(batch) < max_size:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(message_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            break
+        batch.append(item)
+    return batch
+
+
+def estimate_payload_size(message_data):
+    """Cheap upper-bound guess of a message's encoded size, without encoding it."""
+    size = len(message_data.get("content") or "") + 64 * len(message_data.get("attachments") or ())
+    for embed in message_data.get("embeds") or ():
+        size += len(embed.get("description") or "")
+        size += sum(len(field["name"]) + len(field["value"]) for field in embed.get("fields") or ())
+    return size
+
+
+def encode_each(batch):
+    return [orjson.dumps(message_data) for message_data in batch]
+
+
+class Dispatcher:
+    """Redis and HTTP plumbing shared by every MirrorSelfBot instance."""
+
+    def __init__(self, redis_client, batch_url):
+        self.redis_client = redis_client
+        self.batch_url = batch_url
+        self.session = None
+        self.connection_failed = False
+        self.redis_queue = None
+        self.http_queue = None
+        self.dropped_messages = 0
+        self.last_drop_warning = 0.0
+        self.tasks = []
+        # Small pool for encoding unusually large payloads (embed-heavy messages)
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="payload-encode")
+
+    async def start(self):
+        """Attach the shared session and start the batch writers; must be called from the running loop."""
+        self.session = await get_http_session()
+        if not self.tasks:
+            self.redis_queue = asyncio.Queue(maxsize=DISPATCH_QUEUE_SIZE)
+            self.http_queue = asyncio.Queue(maxsize=DISPATCH_QUEUE_SIZE)
+            self.tasks = [
+                asyncio.create_task(self.redis_flusher()),
+                asyncio.create_task(self.http_flusher()),
+            ]
+
+    def push(self, message_data):
+        """Queue message data for the Redis list consumed by bot.py."""
+        self._enqueue(self.redis_queue, message_data, "Redis")
+
+    def forward(self, message_data):
+        """Queue message data for the next batched POST to bot.py."""
+        self._enqueue(self.http_queue, message_data, "HTTP")
+
+    def _enqueue(self, message_queue, message_data, name):
+        try:
+            message_queue.put_nowait(message_data)
+        except asyncio.QueueFull:
+            # Drop the oldest message rather than the newest: fresh messages matter more
+            dropped = message_queue.get_nowait()
+            message_queue.put_nowait(message_data)
+            self.dropped_messages += 1
+            now = time.monotonic()
+            if now - self.last_drop_warning >= DROP_WARNING_INTERVAL:
+                self.last_drop_warning = now
+                logger.warning(
+                    "⚠️ %s dispatch queue full, dropped oldest message %s (%d dropped so far)",
+                    name, dropped.get("message_id"), self.dropped_messages)
+
+    async def encode(self, encoder, obj, messages):
+        """Run encoder(obj) inline, or on the encode pool when `messages` are estimated to be large."""
+        if sum(map(estimate_payload_size, messages)) > LARGE_PAYLOAD_BYTES:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, encoder, obj)
+        return encoder(obj)
+
+    async def redis_flusher(self):
+        """Write queued messages to Redis, one pipelined round-trip per batch."""
+        while True:
+            batch = await collect_batch(self.redis_queue, REDIS_BATCH_SIZE, REDIS_FLUSH_INTERVAL)
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                await self.write_batch(batch)
+            if stopping:
+                return
+
+    async def write_batch(self, batch):
+        """LPUSH a batch of messages and trim the queue in one non-transactional pipeline."""
+        try:
+            payloads = await self.encode(encode_each, batch, batch)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.lpush("message_queue", *payloads)
+                # Bound memory if bot.py stops consuming; the oldest entries are dropped
+                pipe.ltrim("message_queue", 0, MESSAGE_QUEUE_MAXLEN - 1)
+                await pipe.execute()
+        except Exception as e:
+            error_aggregator.record_error(
+                "RedisQueueError",
+                str(e),
+                {"batch_size": len(batch), "message_ids": [m.get("message_id") for m in batch]}
+            )
+            structured_logger.error(
+                "Failed to push messages to Redis",
+                error_type=type(e).__name__,
+                error_message=str(e),
+                batch_size=len(batch)
+            )
+            print(f"❌ ERROR: Failed to push {len(batch)} message(s) to Redis: {e}")
+
+    async def http_flusher(self):
+        """POST queued messages to bot.py's /process_batch endpoint."""
+        while True:
+            batch = await collect_batch(self.http_queue, HTTP_BATCH_SIZE, HTTP_FLUSH_INTERVAL)
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                await self.post_batch(batch)
+            if stopping:
+                return
+
+    async def post_batch(self, batch):
+        """Send one batch to bot.py, scheduling retries for anything it did not accept."""
+        failed = await self.send_batch(batch)
+        if failed:
+            await self.schedule_retries([(batch[index], 0) for index in failed])
+
+    async def send_batch(self, batch):
+        """POST one batch to /process_batch and return the indices of messages bot.py did not accept."""
+        try:
+            payload = await self.encode(orjson.dumps, batch, batch)
+            async with self.session.post(
+                self.batch_url, data=payload, headers=JSON_HEADERS, timeout=POST_TIMEOUT
+            ) as response:
+                if response.status == 200:
+                    self.connection_failed = False
+                    result = await response.json()
+                    return result.get("failed", [])
+                text = await response.text()
+                if response.status == 400:
+                    # Malformed batch; retrying would fail the same way
+                    logger.error("❌ ERROR: bot.py rejected batch of %d messages → %s", len(batch), text)
+                    return []
+                logger.error("❌ ERROR: Failed to send batch (%s) → %s", response.status, text)
+        except aiohttp.ClientConnectionError:
+            if not self.connection_failed:
+                print("🔌 Connection to destination bot failed. Will keep retrying silently...")
+                self.connection_failed = True
+        except asyncio.TimeoutError:
+            logger.error("❌ ERROR: Timed out posting to bot.py")
+        except Exception as e:
+            logger.error("❌ Unexpected error in send_batch: %s", e)
+        return range(len(batch))
+
+    async def schedule_retries(self, retries):
+        """Park failed (message_data, attempt) pairs in Redis until their jittered backoff expires.
+
+        All due entries go out in one ZADD; messages that ran out of retries are dropped and counted.
+        """
+        now = time.time()
+        entries = {}
+        for message_data, attempt in retries:
+            if attempt >= RETRY_MAX_ATTEMPTS:
+                self.dropped_messages += 1
+                error_aggregator.record_error(
+                    "RetryExhausted",
+                    f"Dropped message after {attempt} retries",
+                    {"message_id": message_data.get("message_id"), "dropped_total": self.dropped_messages}
+                )
+                logger.error("❌ Dropping message %s after %d failed retries", message_data.get("message_id"), attempt)
+                continue
+            delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY) + random.uniform(0, RETRY_JITTER)
+            entries[orjson.dumps({"payload": message_data, "attempt": attempt})] = now + delay
+        if not entries:
+            return
+        try:
+            await self.redis_client.zadd(RETRY_QUEUE, entries)
+        except Exception as e:
+            logger.error("❌ Failed to queue %d message(s) for retry: %s", len(entries), e)
+
+    async def retry_worker(self):
+        """Re-send messages from the retry queue as one batch once they are due."""
+        while True:
+            try:
+                due = await self.redis_client.zrangebyscore(RETRY_QUEUE, 0, time.time(), start=0, num=HTTP_BATCH_SIZE)
+                if due:
+                    async with self.redis_client.pipeline(transaction=False) as pipe:
+                        for entry in due:
+                            pipe.zrem(RETRY_QUEUE, entry)
+                        removed = await pipe.execute()
+                    # Skip entries another worker already claimed
+                    retries = [orjson.loads(entry) for entry, claimed in zip(due, removed) if claimed]
+                    if retries:
+                        failed = await self.send_batch([retry["payload"] for retry in retries])
+                        if failed:
+                            await self.schedule_retries(
+                                [(retries[index]["payload"], retries[index]["attempt"] + 1) for index in failed]
+                            )
+            except Exception as e:
+                logger.error("❌ Error in retry worker: %s", e)
+            await asyncio.sleep(1)
+
+    async def close(self):
+        """Let both flushers deliver everything queued or in flight, then stop them."""
+        if self.tasks:
+            try:
+                await asyncio.wait_for(self._stop_flushers(), DISPATCH_CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # wait_for cancels the flushers; whatever they still held is lost
+                logger.warning("⚠️ Dispatcher flushers did not finish within %ss", DISPATCH_CLOSE_TIMEOUT)
+            self.tasks = []
+        self.executor.shutdown(wait=False)
+
+    async def _stop_flushers(self):
+        # _STOP goes in behind everything already queued, so each flusher finishes
+        # its current batch and drains the rest before it returns
+        await self.redis_queue.put(_STOP)
+        await self.http_queue.put(_STOP)
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+# Single dispatcher so all bots share one HTTP connection pool and Redis client
+DISPATCHER = Dispatcher(redis_client, DESTINATION_BATCH_URL)
+
+
+# Text-indicated forwards: "Forwarded from @someone", "originally from: somewhere"
+_FORWARD_RE = re.compile(r"(?:forwarded from|originally from)\s*[@:]?\s*([^\n\r]+)", re.IGNORECASE)
 
 
 class MirrorSelfBot(discord.Client):
     def __init__(self, token, monitored_servers):
-        super().__init__(enable_guild_compression=True)
+        # Messages are forwarded and never looked up again, so skip the message cache.
+        # Member chunking stays on: get_destination_bot_id walks guild.members and the
+        # DM filters rely on author.mutual_guilds, both of which read the member cache
+        super().__init__(
+            enable_guild_compression=True,
+            max_messages=None,
+            guild_ready_timeout=2.0,
+        )
         self.token = token
-        self.monitored_servers = {str(server_id) for server_id in monitored_servers}
-        self.session = aiohttp.ClientSession()
+        # Integer ids so on_message can test message.guild.id without stringifying it
+        self.monitored_servers = parse_ids(monitored_servers, "server")
+        self.dispatcher = DISPATCHER
         self.login_attempts = 0
         self.max_attempts = MAX_LOGIN_ATTEMPTS
         # Track destination bot's user ID to prevent echo loops
         self.destination_bot_id = None
+        self.msg_count = 0
+        self.throughput_task = None
+        # channel_id -> message_data fields that only change when the channel or guild does
+        self.channel_fields_cache = {}
+        # user_id -> (expiry, User or None) for DM relay recipients
+        self.user_cache = {}
 
     async def on_ready(self):
         await self.fetch_guilds()
@@ -471,12 +987,25 @@ class MirrorSelfBot(discord.Client):
         # Try to get destination bot's user ID to prevent echo loops
         await self.get_destination_bot_id()
 
+        GUILD_NAME_INDEX.update({str(guild.id): guild.name for guild in self.guilds})
+
+        # on_ready fires again after reconnects; only start the reporter once
+        if self.throughput_task is None:
+            self.throughput_task = asyncio.create_task(self.report_throughput())
+
+    async def report_throughput(self):
+        """Log how many messages were queued in the last minute."""
+        while True:
+            await asyncio.sleep(60)
+            count, self.msg_count = self.msg_count, 0
+            logger.info("📈 %s: throughput %d msg/60s", self.user, count)
+
     async def get_destination_bot_id(self):
         """Fetch the destination bot's user ID to prevent echo loops."""
         try:
             destination_server_id = get_dm_destination_server(self.token)
             if destination_server_id:
-                guild = discord.utils.get(self.guilds, id=int(destination_server_id))
+                guild = self.get_guild(int(destination_server_id))
                 if guild:
                     # Look for the bot that owns the webhooks
                     for member in guild.members:
@@ -488,78 +1017,80 @@ class MirrorSelfBot(discord.Client):
             logging.warning(f"⚠️ Could not determine destination bot ID: {e}")
 
     async def on_disconnect(self):
-        logging.warning(f"🔌 Disconnected from Discord at {datetime.now(timezone.utc).isoformat()}")
+        logging.warning(f"🔌 Disconnected from Discord at {datetime.now(_UTC).isoformat()}")
 
     async def on_resumed(self):
-        logging.info(f"🔄 Connection resumed with Discord at {datetime.now(timezone.utc).isoformat()}")
-
-    def is_time_or_date_based(self, name):
-        clean_name = re.sub(r'[^\w\s:-]', '', name.lower())
-
-        date_match = re.search(r'\b(\d{1,2})[-/](\d{1,2})\b', clean_name)
-        time_match = re.search(r'\b(\d{1,2})(am|pm)\b', clean_name)
-
-        return bool(date_match or time_match)
-
-    async def send_channel_delete(self, channel):
-        server_real_name = self.get_server_real_name(channel.guild)
-        channel_real_name = self.clean_channel_name(channel.name)
-
-        data = {
-            "action": "delete_channel",
-            "server_real_name": server_real_name,
-            "channel_real_name": channel_real_name
-        }
-        await self.send_to_destination(data)
-
-    async def monitor_deleted_channels(self):
-        await self.wait_until_ready()
-        logging.info("🛡️ Starting deleted channel monitor (only time/date based channels)")
-
-        # Build a dict to track monitored channels: {channel_id: channel_object}
-        monitored_channels = {}
-
-        # Initial population
-        for guild in self.guilds:
-            for channel in guild.text_channels:
-                if self.is_time_or_date_based(channel.name):
-                    monitored_channels[channel.id] = channel
-
-        while True:
+        logging.info(f"🔄 Connection resumed with Discord at {datetime.now(_UTC).isoformat()}")
+
+    def channel_fields(self, channel):
+        """Return the cached, interned channel/server fields of message_data for this channel."""
+        fields = self.channel_fields_cache.get(channel.id)
+        if fields is None:
+            guild = channel.guild
+            category = channel.category
+            channel_name = sys.intern(channel.name)
+            server_name = sys.intern(guild.name)
+            fields = {
+                "channel_real_name": channel_name,
+                "server_real_name": server_name,
+                "channel_id": sys.intern(str(channel.id)),
+                "channel_name": channel_name,
+                "category_name": sys.intern(category.name) if category else "uncategorized",
+                "server_id": sys.intern(str(guild.id)),
+                "server_name": server_name,
+            }
+            self.channel_fields_cache[channel.id] = fields
+        return fields
+
+    async def on_guild_channel_update(self, before, after):
+        # Name or category changes invalidate the cached fields
+        self.channel_fields_cache.pop(after.id, None)
+        # A category rename only fires for the category; its channels cache its name too
+        if isinstance(after, discord.CategoryChannel):
+            for channel in after.channels:
+                self.channel_fields_cache.pop(channel.id, None)
+
+    async def on_guild_join(self, guild):
+        GUILD_NAME_INDEX[str(guild.id)] = guild.name
+
+    async def on_guild_update(self, before, after):
+        if before.name != after.name:
+            GUILD_NAME_INDEX[str(after.id)] = after.name
+            self.channel_fields_cache.clear()
+
+    async def on_guild_remove(self, guild):
+        # Keep the name while another self-bot is still in the guild
+        if not any(bot.get_guild(guild.id) for bot in active_bots.values() if bot is not self):
+            GUILD_NAME_INDEX.pop(str(guild.id), None)
+
+    async def on_guild_channel_delete(self, channel):
+        if (isinstance(channel, discord.TextChannel) and channel.guild.id in self.monitored_servers
+                and is_time_or_date_based(channel.name)):
+            self.send_channel_delete(channel)
+        self.channel_fields_cache.pop(channel.id, None)
+
+    def send_channel_delete(self, channel):
+        """Ask bot.py to delete the mirror of a deleted time/date channel."""
+        delete_data = {"action": "delete_channel", **self.channel_fields(channel)}
+        self.dispatcher.forward(delete_data)
+        logger.info("🗑️ Forwarded deletion of #%s in %s", channel.name, channel.guild.name)
+
+    async def wait_for_attachments(self, message):
+        """Return the message, refetched after a short wait if some attachments are still incomplete.
+
+        Discord decides attachment availability server-side at dispatch time, so
+        messages whose attachments already carry a URL and size are used as-is.
+        """
+        if message.attachments and any(not a.url or a.size == 0 for a in message.attachments):
+            await asyncio.sleep(0.25)
             try:
-                # Rebuild monitored_channels continuously
-                for guild in self.guilds:
-                    live_channels = await guild.fetch_channels()
-                    live_channel_ids = {c.id for c in live_channels if isinstance(c, discord.TextChannel)}
-
-                    # Add new channels if they match time/date format
-                    for channel in live_channels:
-                        if isinstance(channel, discord.TextChannel):
-                            if self.is_time_or_date_based(channel.name) and channel.id not in monitored_channels:
-                                monitored_channels[channel.id] = channel
-                                logging.info(
-                                    f"➕ Now monitoring new time/date channel: {channel.name} (ID: {channel.id})")
-
-                # Check if any monitored channel has been deleted
-                for channel_id, channel in list(monitored_channels.items()):
-                    guild = channel.guild
-                    live_channels = await guild.fetch_channels()
-                    live_channel_ids = {c.id for c in live_channels if isinstance(c, discord.TextChannel)}
-
-                    if channel_id not in live_channel_ids:
-                        logging.info(f"🗑️ Detected deletion of {channel.name} (ID {channel.id}). Notifying bot.py...")
-                        await self.send_channel_delete(channel)
-                        monitored_channels.pop(channel_id, None)
-
-            except Exception as e:
-                logging.error(f"⚠️ Error in monitor_deleted_channels: {e}")
-
-            await asyncio.sleep(10)  # Recheck every 10 seconds
+                return await message.channel.fetch_message(message.id)
+            except discord.HTTPException as e:
+                logger.warning("⚠️ Could not refetch message %s for attachments: %s", message.id, e)
+        return message
 
     @async_performance_monitor
     async def on_message(self, message):
-        await asyncio.sleep(0.5)  # Small delay to let Discord register attachments
-
         # Skip messages from the destination bot to prevent echo loops
         if self.destination_bot_id and message.author.id == self.destination_bot_id:
             return
@@ -572,6 +1103,12 @@ class MirrorSelfBot(discord.Client):
         if not message.guild:
             return  # Ignore other non-guild messages
 
+        server = message.guild
+
+        # ✅ Only process messages from servers explicitly listed in config.json
+        if server.id not in self.monitored_servers:
+            return  # ❌ Skip processing if the server is not listed
+
         # Skip "posted by" bot messages with attachments (these are usually automated reposts)
         if (
                 message.author.bot
@@ -580,50 +1117,31 @@ class MirrorSelfBot(discord.Client):
         ):
             return
 
-        server = message.guild
-        server_id = str(server.id) if server else "Unknown"
-
-        # Fetch the correct server name
-        server_name = server.name if server else f"Unknown Server ({server_id})"
-
-        # ✅ Only process messages from servers explicitly listed in config.json
-        if server_id not in self.monitored_servers:
-            return  # ❌ Skip processing if the server is not listed
-
-        excluded_categories = get_excluded_categories(server_id)
-        excluded_channels = get_excluded_channels(server_id)
-
         # Check excluded categories and channels
-        if message.channel.category:
-            category_id = message.channel.category.id
-            if category_id in excluded_categories:
-                return
+        excluded_categories, excluded_channels = get_server_exclusions(server.id)
+        channel = message.channel
+        category = channel.category
+        if category and category.id in excluded_categories:
+            return
 
-        if message.channel.id in excluded_channels:
+        if channel.id in excluded_channels:
             return
 
-        structured_logger.info(
-            "Message accepted for processing",
-            server_name=server_name,
-            server_id=server_id,
-            channel_name=message.channel.name,
-            channel_id=message.channel.id,
-            author_id=message.author.id,
-            message_id=message.id
-        )
+        server_name = server.name
+
+        message = await self.wait_for_attachments(message)
 
         # Map all roles mentioned in the message (id → name)
-        role_mentions = {}
-        for role in message.role_mentions:
-            role_mentions[str(role.id)] = role.name
+        role_mentions = {str(role.id): role.name for role in message.role_mentions}
 
         # Handle reply information
         reply_to = None
         reply_text = None
-        if message.reference and isinstance(message.reference.resolved, discord.Message):
-            original_msg = message.reference.resolved
-            reply_to = original_msg.author.display_name
-            reply_text = original_msg.clean_content[:180]  # clip to 180 chars
+        resolved = message.reference.resolved if message.reference else None
+        ref_msg = resolved if isinstance(resolved, discord.Message) else None
+        if ref_msg:
+            reply_to = ref_msg.author.display_name
+            reply_text = ref_msg.clean_content[:180]  # clip to 180 chars
 
         # CORRECTED FORWARDED MESSAGE DETECTION
         # Only detect forwards when a user manually forwards a message within Discord
@@ -637,61 +1155,47 @@ class MirrorSelfBot(discord.Client):
                 hasattr(message, 'message_reference')
                 and message.message_reference
                 and message.message_reference.guild_id != message.guild.id  # Different guild
-                and message.reference
-                and isinstance(message.reference.resolved, discord.Message)
+                and ref_msg
         ):
-            ref_msg = message.reference.resolved
             forwarded_from = ref_msg.author.display_name or str(ref_msg.author)
             forwarded_embeds = [self.format_embed(embed) for embed in ref_msg.embeds]
             forwarded_attachments = [attachment.url for attachment in ref_msg.attachments]
-            logging.info(f"🔄 Detected cross-guild forwarded message from {forwarded_from}")
+            logger.info("🔄 Detected cross-guild forwarded message from %s", forwarded_from)
 
         # Method 2: Empty message that quotes another message (manual forwarding)
         elif (
                 not message.content.strip()  # Empty content
                 and not message.embeds  # No embeds
                 and not message.attachments  # No attachments
-                and message.reference  # References another message
-                and isinstance(message.reference.resolved, discord.Message)
+                and ref_msg  # References another message
                 and not message.author.bot  # User, not bot
         ):
-            ref_msg = message.reference.resolved
             # Only consider it forwarded if the referenced message has content/embeds/attachments
-            if ref_msg and (ref_msg.embeds or ref_msg.attachments or ref_msg.content.strip()):
+            if (ref_msg.embeds or ref_msg.attachments or ref_msg.content.strip()):
                 forwarded_from = ref_msg.author.display_name or str(ref_msg.author)
                 forwarded_embeds = [self.format_embed(embed) for embed in ref_msg.embeds]
                 forwarded_attachments = [attachment.url for attachment in ref_msg.attachments]
-                logging.info(f"🔄 Detected manual forwarded message from {forwarded_from}")
+                logger.info("🔄 Detected manual forwarded message from %s", forwarded_from)
 
         # Method 3: Detect when someone manually types "forwarded from" or similar
-        elif message.content and any(
-                keyword in message.content.lower() for keyword in ["forwarded from", "originally from"]):
-            import re
-            forward_pattern = r"(?:forwarded from|originally from)\s*[@:]?\s*([^\n\r]+)"
-            match = re.search(forward_pattern, message.content, re.IGNORECASE)
-            if match:
-                forwarded_from = match.group(1).strip()
-                logging.info(f"🔄 Detected text-indicated forwarded message from {forwarded_from}")
+        elif message.content and (match := _FORWARD_RE.search(message.content)):
+            forwarded_from = match.group(1).strip()
+            logger.info("🔄 Detected text-indicated forwarded message from %s", forwarded_from)
 
         # DON'T detect cross-posting or application_id as forwarding - these are different features
 
         # Prepare message data
+        author = message.author
         message_data = {
+            **self.channel_fields(channel),
             "reply_to": reply_to,
             "reply_text": reply_text,
-            "channel_real_name": message.channel.name,
-            "server_real_name": server.name,
             "mentioned_roles": role_mentions,
             "message_id": str(message.id),
-            "channel_id": str(message.channel.id),
-            "channel_name": message.channel.name,
-            "category_name": message.channel.category.name if message.channel.category else "uncategorized",
-            "server_id": str(server_id),
-            "server_name": server_name,
             "content": message.content,
-            "author_id": str(message.author.id),
-            "author_name": (getattr(message.author, "nick", None) or str(message.author)).replace("#0", ""),
-            "author_avatar": message.author.avatar.url if message.author.avatar else None,
+            "author_id": str(author.id),
+            "author_name": (getattr(author, "nick", None) or str(author)).replace("#0", ""),
+            "author_avatar": author.avatar.url if author.avatar else None,
             "timestamp": str(message.created_at),
             "attachments": [attachment.url for attachment in message.attachments],
             "forwarded_from": forwarded_from,
@@ -703,39 +1207,15 @@ class MirrorSelfBot(discord.Client):
             "is_forwarded": bool(forwarded_from),
         }
 
-        logging.debug(f"Queued: {message.id} from {server_name}#{message.channel.name}")
+        # Per-message detail stays at DEBUG; throughput is reported once a minute
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Queued: %s from %s#%s", message.id, server_name, channel.name)
+        self.msg_count += 1
 
-        try:
-            redis_client.lpush("message_queue", json.dumps(message_data))
-            structured_logger.info(
-                "Message queued to Redis",
-                message_id=message.id,
-                author_id=message.author.id,
-                channel_name=message.channel.name,
-                server_name=server_name
-            )
-            log_message(
-                "Pushed message to Redis", 
-                author=str(message.author),
-                channel=message.channel.name,
-                server=server_name
-            )
-        except Exception as e:
-            error_aggregator.record_error(
-                "RedisQueueError",
-                str(e),
-                {"message_id": message.id, "server_id": server_id}
-            )
-            structured_logger.error(
-                "Failed to push message to Redis",
-                error_type=type(e).__name__,
-                error_message=str(e),
-                message_id=message.id
-            )
-            print(f"❌ ERROR: Failed to push message to Redis: {e}")
+        self.dispatcher.push(message_data)
 
         # ✅ Send to bot.py
-        await self.send_to_destination(message_data)
+        self.dispatcher.forward(message_data)
 
     async def handle_dm_message(self, message):
         """Handle DM messages for mirroring."""
@@ -751,10 +1231,10 @@ class MirrorSelfBot(discord.Client):
         if message.author.bot:
             # Only allow specific bots
             if not is_allowed_bot(message.author):
-                logging.info(f"🚫 Blocked DM from unauthorized bot: {message.author}")
+                logger.info("🚫 Blocked DM from unauthorized bot: %s", message.author)
                 return
             else:
-                logging.info(f"✅ Allowing DM from authorized bot: {message.author}")
+                logger.info("✅ Allowing DM from authorized bot: %s", message.author)
         else:
             # For non-bot users, apply spam/friend request filters
             if not should_allow_dm(message):
@@ -762,16 +1242,20 @@ class MirrorSelfBot(discord.Client):
 
         destination_server_id = get_dm_destination_server(self.token)
         if not destination_server_id:
-            logging.warning(
-                f"⚠️ DM mirroring enabled but no destination server configured for token {self.token[:10]}...")
+            logger.warning(
+                "⚠️ DM mirroring enabled but no destination server configured for token %s...", self.token[:10])
             return
 
         # Get proper display names
         author_display_name = get_user_display_name(message.author)
         self_display_name = get_user_display_name(self.user)
 
-        logging.info(
-            f"📨 Processing DM from {author_display_name} (ID: {message.author.id}) to {self_display_name} (ID: {self.user.id})")
+        logger.info(
+            "📨 Processing DM from %s (ID: %s) to %s (ID: %s)",
+            author_display_name, message.author.id, self_display_name, self.user.id)
+
+        # Only messages that will actually be mirrored pay for the attachment refetch
+        message = await self.wait_for_attachments(message)
 
         # Create DM message data with correct token mapping
         message_data = {
@@ -806,137 +1290,140 @@ class MirrorSelfBot(discord.Client):
             "bot_name": str(message.author) if message.author.bot else None  # Bot name for reference
         }
 
-        try:
-            redis_client.lpush("message_queue", json.dumps(message_data))
-            logging.info(f"✅ QUEUED DM to Redis: message_id={message.id} from {author_display_name}")
-            log_message(
-                "Pushed DM to Redis", 
-                author=author_display_name,
-                message_type="dm"
-            )
-        except Exception as e:
-            logging.error(f"❌ ERROR: Failed to push DM to Redis: {e}")
+        self.dispatcher.push(message_data)
+        logger.info("✅ QUEUED DM to Redis: message_id=%s from %s", message.id, author_display_name)
+        log_message(
+            "Pushed DM to Redis", 
+            author=author_display_name,
+            message_type="dm"
+        )
 
     def format_embed(self, embed):
-        return {
-            "title": embed.title or None,
-            "description": embed.description or None,
-            "url": embed.url or None,
-            "color": embed.color.value if embed.color else None,
-            "fields": [{"name": field.name, "value": field.value} for field in embed.fields] if embed.fields else [],
-            "image": {"url": embed.image.url} if embed.image else None,
-            "thumbnail": {"url": embed.thumbnail.url} if embed.thumbnail else None,
-            "footer": {"text": embed.footer.text} if embed.footer else None,
-            "author": {"name": embed.author.name} if embed.author else None,
-        }
-
-    async def send_to_destination(self, message_data, retries=3):
-        """Send the message to bot.py and print debug output."""
-        if not self.session:
-            print("⚠️ ERROR: aiohttp session is not initialized!")
-            self.session = aiohttp.ClientSession()
-
-        attempt = 0
-        while True:
-            try:
-                async with self.session.post(DESTINATION_BOT_URL, json=message_data) as response:
-                    if response.status == 200:
-                        return
-                    else:
-                        text = await response.text()
-                        logging.error(f"❌ ERROR: Failed to send message ({response.status}) → {text}")
-                        await asyncio.sleep(5)
-            except aiohttp.ClientConnectionError as e:
-                if attempt == 0:
-                    print("🔌 Connection to destination bot failed. Will keep retrying silently...")
-                attempt += 1
-                await asyncio.sleep(10)  # Wait longer before retrying
-            except Exception as e:
-                logging.error(f"❌ Unexpected error in send_to_destination: {e}")
-                await asyncio.sleep(10)
+        # Only populated keys are emitted; bot.py reads every field with .get()
+        data = {}
+        if embed.title:
+            data["title"] = embed.title
+        if embed.description:
+            data["description"] = embed.description
+        if embed.url:
+            data["url"] = embed.url
+        if embed.color:
+            data["color"] = embed.color.value
+        if embed.fields:
+            data["fields"] = [{"name": field.name, "value": field.value} for field in embed.fields]
+        if embed.image:
+            data["image"] = {"url": embed.image.url}
+        if embed.thumbnail:
+            data["thumbnail"] = {"url": embed.thumbnail.url}
+        if embed.footer:
+            data["footer"] = {"text": embed.footer.text}
+        if embed.author:
+            data["author"] = {"name": embed.author.name}
+        return data
+
+    async def resolve_user(self, user_id):
+        """Look a user up in the client cache, then our TTL cache, before asking the API."""
+        user = self.get_user(user_id)
+        if user:
+            return user
+        now = time.monotonic()
+        cached = self.user_cache.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        try:
+            user = await self.fetch_user(user_id)
+            expires = now + USER_CACHE_TTL
+        except discord.NotFound:
+            # Remember bad ids briefly so repeated relays don't keep hitting the API
+            user = None
+            expires = now + USER_NOT_FOUND_TTL
+        if len(self.user_cache) >= USER_CACHE_SIZE:
+            self.user_cache.clear()
+        self.user_cache[user_id] = (expires, user)
+        return user
 
     async def send_dm_to_user(self, user_id, content):
         """Send a DM to a specific user using this bot's token."""
         try:
-            user = await self.fetch_user(int(user_id))
+            user = await self.resolve_user(int(user_id))
             if user:
                 await user.send(content)
-                logging.info(f"✅ Sent DM to {user}: {content[:50]}...")
+                logger.info("✅ Sent DM to %s: %.50s...", user, content)
                 return True
             else:
-                logging.error(f"❌ Could not find user with ID {user_id}")
+                logger.error("❌ Could not find user with ID %s", user_id)
                 return False
         except discord.Forbidden as e:
-            logging.error(f"❌ Cannot send DM to user {user_id}: {e}")
+            logger.error("❌ Cannot send DM to user %s: %s", user_id, e)
             return False
         except Exception as e:
-            logging.error(f"❌ Failed to send DM to user {user_id}: {e}")
+            logger.error("❌ Failed to send DM to user %s: %s", user_id, e)
             return False
 
-    async def close(self):
-        if self.session:
-            await self.session.close()  # Ensure session is properly closed
 
+# Login failures that mean the token itself is bad, so retrying is pointless
+_INVALID_TOKEN_RE = re.compile(r"improper token|401", re.IGNORECASE)
 
-async def start_self_bots():
-    for token, token_data in TOKENS.items():
-        if token_data.get("disabled", False):
-            logging.warning(f"⛔ Token disabled: {token[:10]}... Skipping.")
-            continue
-
-        # Skip if token has failed status
-        if token_data.get("status") == "failed":
-            user_info = token_data.get("user_info", {})
-            username = user_info.get("name", "Unknown User")
-            logging.warning(f"⛔ Token for {username} marked as failed: {token[:10]}... Skipping.")
-            print(f"⛔ Skipping failed token for user: {username}")
-            continue
+MAX_CONCURRENT_LOGINS = 4  # bots identifying with the gateway at the same time
+LOGIN_READY_TIMEOUT = 30  # seconds a connecting bot may hold a login slot
+_login_semaphore = None
 
-        server_ids = set(token_data["servers"].keys())
-        print(f"🔹 Loading bot with token {token[:10]}... Monitoring servers: {server_ids}")
 
-        bot = MirrorSelfBot(token, server_ids)
+def get_login_semaphore():
+    """Return the login semaphore, created on first use so it belongs to the running loop."""
+    global _login_semaphore
+    if _login_semaphore is None:
+        _login_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOGINS)
+    return _login_semaphore
 
-        async def try_start_bot(bot_instance, token):
-            delay = 5
-            attempts = 0
-            max_attempts = bot_instance.max_attempts
 
-            while attempts < max_attempts:
-                try:
-                    attempts += 1
-                    print(f"🔄 Login attempt {attempts}/{max_attempts} for token {token[:10]}...")
-                    await bot_instance.start(token)
-                except discord.LoginFailure as e:
-                    error_msg = str(e)
-                    if "improper token" in error_msg.lower() or "401" in error_msg:
-                        print(f"❌ Invalid token detected: {token[:10]}... Stopping login attempts.")
-                        logging.error(f"❌ Invalid token: {token[:10]}... Error: {e}")
-                        mark_token_as_failed(token, error_msg)
-                        failed_tokens.add(token)
-
-                        # Try to get user info from config if available
-                        token_data = TOKENS.get(token, {})
-                        user_info = token_data.get("user_info", {})
-                        if user_info:
-                            print(f"ℹ️ This token belongs to user: {user_info.get('name', 'Unknown')}")
-                        else:
-                            print(f"ℹ️ No user info available for this token. Fix the token in config.json")
-                        break
-                except Exception as e:
-                    logging.error(f"❌ Bot crashed (attempt {attempts}/{max_attempts}). Error: {e}")
-                    if attempts < max_attempts:
-                        print(f"⏳ Reconnecting in {delay} seconds...")
-                        await asyncio.sleep(delay)
-                        delay = min(delay * 2, 60)  # cap backoff at 60 seconds
-                    else:
-                        print(f"❌ Max login attempts reached for token {token[:10]}... Stopping.")
-                        mark_token_as_failed(token, f"Max attempts reached: {str(e)}")
-                        failed_tokens.add(token)
-                        break
+async def try_start_bot(bot_instance, token):
+    """Log a bot in, retrying with backoff and marking the token failed when it can't."""
+    delay = 5
+    attempts = 0
+    max_attempts = bot_instance.max_attempts
 
-        asyncio.create_task(try_start_bot(bot, token))
-        asyncio.create_task(bot.monitor_deleted_channels())
+    while attempts < max_attempts:
+        try:
+            attempts += 1
+            print(f"🔄 Login attempt {attempts}/{max_attempts} for token {token[:10]}...")
+            # Hold a login slot until the gateway is ready (or the wait times out)
+            async with get_login_semaphore():
+                await bot_instance.login(token)
+                connect_task = asyncio.create_task(bot_instance.connect())
+                ready_task = asyncio.create_task(bot_instance.wait_until_ready())
+                await asyncio.wait(
+                    (connect_task, ready_task), timeout=LOGIN_READY_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+                )
+                ready_task.cancel()
+            await connect_task
+        except discord.LoginFailure as e:
+            error_msg = str(e)
+            if _INVALID_TOKEN_RE.search(error_msg):
+                print(f"❌ Invalid token detected: {token[:10]}... Stopping login attempts.")
+                logging.error(f"❌ Invalid token: {token[:10]}... Error: {e}")
+                mark_token_as_failed(token, error_msg)
+                failed_tokens.add(token)
+
+                # Try to get user info from config if available
+                token_data = TOKENS.get(token, {})
+                user_info = token_data.get("user_info", {})
+                if user_info:
+                    print(f"ℹ️ This token belongs to user: {user_info.get('name', 'Unknown')}")
+                else:
+                    print(f"ℹ️ No user info available for this token. Fix the token in config.json")
+                break
+        except Exception as e:
+            logging.error(f"❌ Bot crashed (attempt {attempts}/{max_attempts}). Error: {e}")
+            if attempts < max_attempts:
+                print(f"⏳ Reconnecting in {delay} seconds...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)  # cap backoff at 60 seconds
+            else:
+                print(f"❌ Max login attempts reached for token {token[:10]}... Stopping.")
+                mark_token_as_failed(token, f"Max attempts reached: {str(e)}")
+                failed_tokens.add(token)
+                break
 
 
 def shutdown_handler(bot_instances):
@@ -957,30 +1444,37 @@ bot_instances = {}
 async def send_dm_via_token(token, user_id, content):
     """Send a DM using a specific token's bot instance."""
     try:
-        logging.info(f"🔍 Looking for bot instance with token {token[:10]}...")
-        logging.info(f"🔍 Available bot instances: {list(bot_instances.keys())[:3]}...")  # Show first 3 tokens
+        logger.info("🔍 Looking for bot instance with token %.10s...", token)
 
-        if token in bot_instances:
-            bot_instance = bot_instances[token]
-            logging.info(f"✅ Found bot instance for token {token[:10]}...")
+        bot_instance = bot_instances.get(token)
+        if bot_instance is not None:
+            logger.info("✅ Found bot instance for token %.10s...", token)
 
             success = await bot_instance.send_dm_to_user(user_id, content)
             if success:
-                logging.info(f"✅ DM sent successfully via token {token[:10]}... to user {user_id}")
+                logger.info("✅ DM sent successfully via token %.10s... to user %s", token, user_id)
             else:
-                logging.error(f"❌ Failed to send DM via token {token[:10]}... to user {user_id}")
+                logger.error("❌ Failed to send DM via token %.10s... to user %s", token, user_id)
             return success
         else:
-            logging.error(f"❌ Bot instance not found for token {token[:10]}...")
-            logging.error(f"❌ Available tokens: {[t[:10] + '...' for t in bot_instances.keys()]}")
+            # Only the failure path pays for listing the known tokens
+            logger.error("❌ Bot instance not found for token %.10s...", token)
+            logger.error("❌ Available tokens (%d): %s", len(bot_instances), [t[:10] + '...' for t in bot_instances])
             return False
     except Exception as e:
-        logging.error(f"❌ Exception in send_dm_via_token: {e}")
+        logger.error("❌ Exception in send_dm_via_token: %s", e)
         return False
 
 
+# Last bot_instances snapshot written to Redis, so unchanged ticks can skip the SET
+_last_shared_instances = None
+_last_shared_at = 0.0
+SHARE_REFRESH_INTERVAL = 300  # rewrite an unchanged snapshot this often in case Redis lost it
+
+
 async def share_bot_instances():
     """Share bot instances with bot.py for channel blocking."""
+    global _last_shared_instances, _last_shared_at
     try:
         instance_data = {}
         for token, bot_instance in bot_instances.items():
@@ -991,7 +1485,14 @@ async def share_bot_instances():
                     "guilds": [str(guild.id) for guild in bot_instance.guilds]
                 }
 
-        redis_client.set("bot_instances", json.dumps(instance_data))
+        payload = orjson.dumps(instance_data)
+        now = time.monotonic()
+        if payload == _last_shared_instances and now - _last_shared_at < SHARE_REFRESH_INTERVAL:
+            return
+
+        await redis_client.set("bot_instances", payload)
+        _last_shared_instances = payload
+        _last_shared_at = now
         logging.info("✅ Shared bot instance data with bot.py")
     except Exception as e:
         logging.error(f"❌ Failed to share bot instances: {e}")
@@ -1009,13 +1510,17 @@ async def start_dm_relay_service():
     """Start a web service to handle DM relay requests from bot.py."""
     from aiohttp import web
 
+    def relay_response(payload, status):
+        """JSON response encoded with orjson instead of json_response's stdlib encoder."""
+        return web.Response(body=orjson.dumps(payload), status=status, content_type="application/json")
+
     async def handle_dm_relay(request):
         """Handle DM relay requests."""
         try:
-            data = await request.json()
+            data = await request.json(loads=orjson.loads)
             action = data.get("action")
 
-            logging.info(f"📨 Received DM relay request: {data}")
+            logger.info("📨 Received DM relay request: %s", data)
 
             if action == "send_dm":
                 token = data.get("token")
@@ -1023,80 +1528,109 @@ async def start_dm_relay_service():
                 content = data.get("content", "")
                 attachments = data.get("attachments", [])
 
-                logging.info(
-                    f"📤 Processing DM relay: token={token[:10]}... user_id={user_id} content='{content[:50]}...'")
+                logger.info("📤 Processing DM relay: token=%.10s... user_id=%s content='%.50s...'", token, user_id, content)
 
                 # Check if bot instance exists
                 if token not in bot_instances:
                     error_msg = f"Bot instance not found for token {token[:10]}..."
-                    logging.error(f"❌ {error_msg}")
-                    return web.json_response({"status": "error", "message": error_msg}, status=404)
+                    logger.error("❌ %s", error_msg)
+                    return relay_response({"status": "error", "message": error_msg}, status=404)
 
                 # Send DM via the appropriate bot instance
                 success = await send_dm_via_token(token, user_id, content)
 
                 if success:
-                    logging.info(f"✅ DM relay successful to user {user_id}")
-                    return web.json_response({"status": "success"}, status=200)
+                    logger.info("✅ DM relay successful to user %s", user_id)
+                    return relay_response({"status": "success"}, status=200)
                 else:
                     error_msg = f"Failed to send DM to user {user_id}"
-                    logging.error(f"❌ {error_msg}")
-                    return web.json_response({"status": "error", "message": error_msg}, status=500)
+                    logger.error("❌ %s", error_msg)
+                    return relay_response({"status": "error", "message": error_msg}, status=500)
             elif action == "request_sync":
                 # Handle sync request from bot.py
-                logging.info("📤 Received server sync request from bot.py")
+                logger.info("📤 Received server sync request from bot.py")
                 await sync_server_info_to_bot()
-                return web.json_response({"status": "success", "message": "Server sync triggered"}, status=200)
+                return relay_response({"status": "success", "message": "Server sync triggered"}, status=200)
             else:
                 error_msg = f"Unknown action: {action}"
-                logging.error(f"❌ {error_msg}")
-                return web.json_response({"status": "error", "message": error_msg}, status=400)
+                logger.error("❌ %s", error_msg)
+                return relay_response({"status": "error", "message": error_msg}, status=400)
 
         except Exception as e:
-            error_msg = f"Error in DM relay service: {str(e)}"
-            logging.error(f"❌ {error_msg}")
-            return web.json_response({"status": "error", "message": error_msg}, status=500)
+            error_msg = f"Error in DM relay service: {e}"
+            logger.error("❌ %s", error_msg)
+            return relay_response({"status": "error", "message": error_msg}, status=500)
 
     app = web.Application()
     app.router.add_post("/send_dm", handle_dm_relay)
     app.router.add_post("/request_sync", handle_dm_relay)  # Add sync endpoint
-    runner = web.AppRunner(app)
+    # The handler logs what it needs; skip aiohttp's per-request access log line
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, "127.0.0.1", 5001)
+    site = web.TCPSite(runner, "127.0.0.1", 5001, backlog=256)
     await site.start()
     logging.info("✅ DM relay service started on port 5001")
     print("📡 DM relay service running on http://127.0.0.1:5001")
 
+    # Optional Unix socket for a bot.py on the same host (same variable bot.py reads)
+    if DM_RELAY_UNIX_SOCKET:
+        unix_site = web.UnixSite(runner, DM_RELAY_UNIX_SOCKET)
+        await unix_site.start()
+        logging.info(f"✅ DM relay service also listening on unix:{DM_RELAY_UNIX_SOCKET}")
+
+
+DM_RELAY_DRAIN = 31  # extra queued relays picked up in one pipeline after BRPOP wakes
+
+
+async def send_relays(relay_requests):
+    """Send one token's DM relay requests in order."""
+    for relay_request in relay_requests:
+        try:
+            token = relay_request.get("token")
+            user_id = relay_request.get("user_id")
+            content = relay_request.get("content", "")
+
+            # Send the DM
+            success = await send_dm_via_token(token, user_id, content)
+            if success:
+                logger.info("✅ DM relay successful to user %s", user_id)
+            else:
+                logger.error("❌ DM relay failed to user %s", user_id)
+
+        except Exception as e:
+            logger.error("❌ Error processing DM relay: %s", e)
+
 
 async def process_dm_relay_queue():
     """Process DM relay requests from Redis queue."""
     while True:
         try:
-            # Check for DM relay requests
-            relay_data = redis_client.rpop("dm_relay_queue")
-            if relay_data:
+            # Block server-side until a DM relay request arrives
+            item = await redis_client.brpop("dm_relay_queue", timeout=5)
+            if not item:
+                continue
+            batch = [item[1]]
+
+            # Drain any burst behind it in one round trip
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for _ in range(DM_RELAY_DRAIN):
+                    pipe.rpop("dm_relay_queue")
+                batch.extend(relay_data for relay_data in await pipe.execute() if relay_data)
+
+            # Different accounts send in parallel; each account keeps its queue order
+            by_token = {}
+            for relay_data in batch:
                 try:
-                    relay_request = json.loads(relay_data)
-                    token = relay_request.get("token")
-                    user_id = relay_request.get("user_id")
-                    content = relay_request.get("content", "")
-
-                    # Send the DM
-                    success = await send_dm_via_token(token, user_id, content)
-                    if success:
-                        logging.info(f"✅ DM relay successful to user {user_id}")
-                    else:
-                        logging.error(f"❌ DM relay failed to user {user_id}")
-
-                except json.JSONDecodeError:
-                    logging.error(f"❌ Invalid JSON in DM relay queue: {relay_data}")
+                    relay_request = orjson.loads(relay_data)
+                    by_token.setdefault(relay_request.get("token"), []).append(relay_request)
+                except orjson.JSONDecodeError:
+                    logger.error("❌ Invalid JSON in DM relay queue: %s", relay_data)
                 except Exception as e:
-                    logging.error(f"❌ Error processing DM relay: {e}")
-
-            await asyncio.sleep(1)
+                    logger.error("❌ Error processing DM relay: %s", e)
+            await asyncio.gather(*(send_relays(requests) for requests in by_token.values()))
 
         except Exception as e:
-            logging.error(f"❌ Error in DM relay queue processor: {e}")
+            logger.error("❌ Error in DM relay queue processor: %s", e)
             await asyncio.sleep(5)
 
 
@@ -1105,17 +1639,18 @@ async def main():
     global bot_instances, active_bots
 
     # Start config file watcher
-    config_observer = start_config_watcher()
+    reload_event = asyncio.Event()
+    config_observer = start_config_watcher(asyncio.get_running_loop(), reload_event)
 
     # First, add the max_login_attempts setting if it doesn't exist
     if "max_login_attempts" not in config.get("settings", {}):
         config["settings"]["max_login_attempts"] = 3
-        save_config(config)
+        schedule_config_save()
 
     # Initialize dm_mappings if it doesn't exist
     if "dm_mappings" not in config:
         config["dm_mappings"] = {}
-        save_config(config)
+        schedule_config_save()
 
     enabled_tokens = [(t, d) for t, d in TOKENS.items() if not d.get("disabled", False) and d.get("status") != "failed"]
 
@@ -1123,11 +1658,16 @@ async def main():
         print("❌ No valid tokens found. Please check your config.json")
         return
 
+    # Shared HTTP session for every bot instance
+    await DISPATCHER.start()
+
+    asyncio.create_task(DISPATCHER.retry_worker())
+
     # Start DM relay service
     asyncio.create_task(start_dm_relay_service())
     asyncio.create_task(process_dm_relay_queue())
 
-    for index, (token, token_data) in enumerate(enabled_tokens):
+    for token, token_data in enabled_tokens:
         server_ids = set(token_data["servers"].keys())
 
         # Show user info if available
@@ -1148,44 +1688,7 @@ async def main():
         bot_instances[token] = bot  # Store for DM relay functionality
         active_bots[token] = bot  # Store for config reloading
 
-        async def try_start_bot(bot_instance, token):
-            delay = 5
-            attempts = 0
-            max_attempts = bot_instance.max_attempts
-
-            while attempts < max_attempts:
-                try:
-                    attempts += 1
-                    print(f"🔄 Login attempt {attempts}/{max_attempts} for token {token[:10]}...")
-                    await bot_instance.start(token)
-                except discord.LoginFailure as e:
-                    error_msg = str(e)
-                    if "improper token" in error_msg.lower() or "401" in error_msg:
-                        print(f"❌ Invalid token detected: {token[:10]}... Stopping login attempts.")
-                        logging.error(f"❌ Invalid token: {token[:10]}... Error: {e}")
-                        mark_token_as_failed(token, error_msg)
-
-                        # Try to get user info from config if available
-                        token_data = TOKENS.get(token, {})
-                        user_info = token_data.get("user_info", {})
-                        if user_info:
-                            print(f"ℹ️ This token belongs to user: {user_info.get('name', 'Unknown')}")
-                        else:
-                            print(f"ℹ️ No user info available for this token. Fix the token in config.json")
-                        break
-                except Exception as e:
-                    logging.error(f"❌ Bot crashed (attempt {attempts}/{max_attempts}). Error: {e}")
-                    if attempts < max_attempts:
-                        print(f"⏳ Reconnecting in {delay} seconds...")
-                        await asyncio.sleep(delay)
-                        delay = min(delay * 2, 60)
-                    else:
-                        print(f"❌ Max login attempts reached for token {token[:10]}... Stopping.")
-                        mark_token_as_failed(token, f"Max attempts reached: {str(e)}")
-                        break
-
-        # ⏳ Stagger bot launches by 5 seconds each
-        await asyncio.sleep(index * 5)
+        # Launch concurrently; try_start_bot limits how many connect at once
         asyncio.create_task(try_start_bot(bot, token))
 
     print("⏳ Waiting for self-bots to finish login...")
@@ -1204,24 +1707,53 @@ async def main():
             print(f"  - Token {token[:10]}... for user: {username}")
         print("\nPlease update these tokens in config.json\n")
 
+    # SIGINT/SIGTERM end the wait below immediately instead of at the next poll
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows event loops don't support add_signal_handler
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop_event.set))
+
+    # Sleep until either a shutdown signal or a config change
+    stop_wait = asyncio.create_task(stop_event.wait())
     try:
-        while True:
-            await asyncio.sleep(5)  # Check every 5 seconds
-            
-            # Check if config reload is needed
-            global config_reload_flag
-            if config_reload_flag:
-                config_reload_flag = False  # Reset flag
+        while not stop_event.is_set():
+            reload_wait = asyncio.create_task(reload_event.wait())
+            await asyncio.wait({stop_wait, reload_wait}, return_when=asyncio.FIRST_COMPLETED)
+            reload_wait.cancel()
+
+            if reload_event.is_set() and not stop_event.is_set():
+                reload_event.clear()
                 await reload_config_dynamically()
     finally:
+        stop_wait.cancel()
         print("👋 Shutting down...")
         config_observer.stop()
         config_observer.join()
         for bot in bot_instances.values():
             await bot.close()
+        if _config_flush_task is not None:
+            # Let an in-flight scheduled save finish; its done callback logs any error
+            await asyncio.wait({_config_flush_task})
+        if _config_save_handle is not None:
+            await flush_config()
+        await DISPATCHER.close()
+        await close_http_session()
+        await redis_client.aclose()
 
 
 if __name__ == "__main__":
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(main())
\ No newline at end of file
+    # uvloop is not available on Windows; fall back to the default loop there
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()  # flush queued records before exit
\ No newline at end of file
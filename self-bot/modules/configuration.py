@@ -1,27 +1,37 @@
-import json
+import orjson
 import os
 
 class Configuration:
     def __init__(self, file_path):
         self.file_path = file_path
         self.data = self.load_config()
+        self._dirty = False
+        self._last_bytes = None
     
     def load_config(self):
         if not os.path.exists(self.file_path):
             return {}
-        with open(self.file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with open(self.file_path, 'rb') as file:
+            return orjson.loads(file.read())
     
     def save_config(self):
-        with open(self.file_path, 'w', encoding='utf-8') as file:
-            json.dump(self.data, file, indent=4)
+        """Atomically write the config, skipping the write if it matches what was last written."""
+        payload = orjson.dumps(self.data, option=orjson.OPT_INDENT_2)
+        if payload != self._last_bytes:
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(payload)
+            os.replace(tmp_path, self.file_path)
+            self._last_bytes = payload
+        self._dirty = False
     
     def set_default(self, default):
         """Set default values if they are missing."""
         for key, value in default.items():
             if key not in self.data:
                 self.data[key] = value
-        self.save_config()
+                self._dirty = True
+        self.flush()
     
     def get(self, key, default=None):
         return self.data.get(key, default)
@@ -30,11 +40,13 @@ class Configuration:
         return self.data[key]
     
     def __setitem__(self, key, value):
+        # Only marks the config dirty; call flush() once after a batch of changes
         self.data[key] = value
-        self.save_config()
+        self._dirty = True
     
     def file_exists(self, file_path):
         return os.path.exists(file_path)
     
     def flush(self):
-        self.save_config()
+        if self._dirty:
+            self.save_config()
@@ -1,14 +1,134 @@
+import atexit
+import copy
 import logging
+import orjson
 import os
-import json
+import queue
 import uuid
 import traceback
 import time
-from datetime import datetime
 from typing import Optional, Dict, Any
 from contextlib import contextmanager
-from threading import local
+from threading import local, Lock, Thread, Event
 from functools import wraps
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# One queue and listener thread shared by every logger in this module; callers only
+# enqueue records, and formatting and file/console writes happen on the listener thread
+_log_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = Lock()
+
+
+class _ContextQueueHandler(QueueHandler):
+    """QueueHandler that stamps the caller's correlation id on the record before it changes threads."""
+
+    def prepare(self, record):
+        # Work on a copy so handlers outside the queue still see the original record
+        record = copy.copy(record)
+        # _local is per-thread, so it must be read here rather than by the listener's formatter
+        record.correlation_id = getattr(_local, 'correlation_id', None)
+        if record.exc_info:
+            # super().prepare() drops exc_info, so carry the exception across as plain data
+            record.exception_info = _exception_info(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return super().prepare(record)
+
+
+def _exception_info(exc_info):
+    return {
+        "type": exc_info[0].__name__,
+        "message": str(exc_info[1]),
+        "traceback": traceback.format_exception(*exc_info)
+    }
+
+
+def _attach_handlers(logger, *handlers):
+    """Route `logger` through the shared queue to `handlers` on the listener thread."""
+    global _listener
+    for handler in handlers:
+        # The listener hands every record to every handler; keep each to its own logger
+        handler.addFilter(logging.Filter(logger.name))
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_stop_listener)
+        else:
+            # The listener reads .handlers per record, so swapping the tuple is enough
+            _listener.handlers = _listener.handlers + handlers
+    logger.addHandler(_ContextQueueHandler(_log_queue))
+
+
+def _detach_handlers(handlers):
+    """Stop delivering records to `handlers`."""
+    with _listener_lock:
+        if _listener is not None:
+            _listener.handlers = tuple(h for h in _listener.handlers if h not in handlers)
+
+
+def _stop_listener():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class BufferedRotatingFileHandler(TimedRotatingFileHandler):
+    """Midnight-rotating file handler that buffers writes instead of flushing every record.
+
+    The buffer is flushed at most every `flush_interval` seconds, immediately for
+    ERROR and above, on rollover and on close.
+    """
+
+    def __init__(self, filename, buffer_size=131072, flush_interval=1.0, **kwargs):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.force_flush = False
+        super().__init__(filename, **kwargs)
+        _register_buffered(self)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=getattr(self, 'errors', None))
+
+    def emit(self, record):
+        self.force_flush = record.levelno >= logging.ERROR
+        super().emit(record)
+
+    def flush(self):
+        # StreamHandler.emit calls this after every record; only hit the disk when due
+        now = time.monotonic()
+        if self.force_flush or now - self.last_flush >= self.flush_interval:
+            self.flush_now()
+
+    def flush_now(self):
+        super().flush()
+        self.last_flush = time.monotonic()
+
+
+_buffered_handlers = []
+_flusher_stop = Event()
+
+
+def _register_buffered(handler):
+    """Track a buffered handler so idle periods still get flushed to disk."""
+    _buffered_handlers.append(handler)
+    if len(_buffered_handlers) == 1:
+        Thread(target=_flush_buffered, name="log-flusher", daemon=True).start()
+        atexit.register(_flusher_stop.set)
+
+
+def _flush_buffered():
+    while not _flusher_stop.wait(1.0):
+        for handler in _buffered_handlers:
+            if time.monotonic() - handler.last_flush >= handler.flush_interval:
+                handler.flush_now()
+
 
 class Logger:
     """Enhanced structured logger with support for contextual data."""
@@ -39,13 +159,15 @@ class Logger:
         except:
             pass  # Fallback for older Python versions
             
-        self.logger.addHandler(console_handler)
-
-        # File handler (all levels to file) with UTF-8 encoding
-        log_filename = datetime.now().strftime("logs/structured_%Y-%m-%d.log")
-        file_handler = logging.FileHandler(log_filename, encoding='utf-8')
+        # File handler (all levels to file) with UTF-8 encoding, rolled over at midnight
+        # into structured.log.YYYY-MM-DD so long-running processes don't stay on one day's file
+        file_handler = BufferedRotatingFileHandler(
+            "logs/structured.log", when="midnight", backupCount=14, encoding='utf-8', delay=True, utc=True
+        )
         file_handler.setFormatter(log_formatter)
-        self.logger.addHandler(file_handler)
+
+        self._handlers = (console_handler, file_handler)
+        _attach_handlers(self.logger, *self._handlers)
 
     def _log_structured(self, level, message, **kwargs):
         """Log with structured data support."""
@@ -89,6 +211,7 @@ class Logger:
         self._log_structured(logging.INFO, f"SUCCESS: {message}", **kwargs)
 
     def reset(self):
+        _detach_handlers(self._handlers)
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
             
@@ -113,12 +236,28 @@ class CorrelationContext:
     def __exit__(self, exc_type, exc_val, exc_tb):
         _local.correlation_id = None
 
+# (whole second, "YYYY-MM-DDTHH:MM:SS") for the last second formatted; swapped as one tuple
+_ts_cache = (None, "")
+
+
+def _utc_iso(t, suffix=""):
+    """ISO-8601 UTC timestamp with microseconds for epoch time `t`, reformatting the date part once per second."""
+    global _ts_cache
+    second = int(t)
+    cached_second, prefix = _ts_cache
+    if cached_second != second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _ts_cache = (second, prefix)
+    return f"{prefix}.{int((t - second) * 1e6):06d}{suffix}"
+
+
 class StructuredFormatter(logging.Formatter):
     """Custom formatter for structured JSON logs."""
     
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # The record's creation time, not the (later) time the listener thread formats it
+            "timestamp": _utc_iso(record.created, "Z"),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -128,17 +267,17 @@ class StructuredFormatter(logging.Formatter):
         }
         
         # Add correlation ID if available
-        correlation_id = getattr(_local, 'correlation_id', None)
+        # Captured on the logging thread by _ContextQueueHandler
+        correlation_id = getattr(record, 'correlation_id', None)
         if correlation_id:
             log_entry["correlation_id"] = correlation_id
         
         # Add exception info if present
-        if record.exc_info:
-            log_entry["exception"] = {
-                "type": record.exc_info[0].__name__,
-                "message": str(record.exc_info[1]),
-                "traceback": traceback.format_exception(*record.exc_info)
-            }
+        exception_info = getattr(record, 'exception_info', None)
+        if exception_info is None and record.exc_info:
+            exception_info = _exception_info(record.exc_info)
+        if exception_info is not None:
+            log_entry["exception"] = exception_info
         
         # Add custom fields from extra
         if hasattr(record, 'extra_fields'):
@@ -146,7 +285,8 @@ class StructuredFormatter(logging.Formatter):
         elif hasattr(record, 'structured_data'):
             log_entry.update(record.structured_data)
         
-        return json.dumps(log_entry, ensure_ascii=False)
+        # orjson emits UTF-8 as-is, matching the old ensure_ascii=False output
+        return orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS).decode()
 
 class PerformanceLogger:
     """Logger for performance metrics and monitoring."""
@@ -158,11 +298,11 @@ class PerformanceLogger:
     def _setup_performance_logger(self):
         """Setup dedicated performance logger."""
         if not self.logger.handlers:
-            perf_handler = logging.FileHandler(
-                f'logs/performance_{datetime.now().strftime("%Y-%m-%d")}.log'
+            perf_handler = BufferedRotatingFileHandler(
+                "logs/performance.log", when="midnight", backupCount=14, encoding='utf-8', delay=True, utc=True
             )
             perf_handler.setFormatter(StructuredFormatter())
-            self.logger.addHandler(perf_handler)
+            _attach_handlers(self.logger, perf_handler)
             self.logger.setLevel(logging.INFO)
     
     def log_function_performance(self, func_name: str, duration: float, **kwargs):
@@ -206,17 +346,18 @@ class ErrorAggregator:
                     context: Optional[Dict[str, Any]] = None):
         """Record an error for aggregation."""
         error_key = f"{error_type}:{error_message[:100]}"  # Limit key length
+        now = _utc_iso(time.time())
         
         if error_key in self.errors:
             self.errors[error_key]["count"] += 1
-            self.errors[error_key]["last_seen"] = datetime.utcnow().isoformat()
+            self.errors[error_key]["last_seen"] = now
         else:
             self.errors[error_key] = {
                 "type": error_type,
                 "message": error_message,
                 "count": 1,
-                "first_seen": datetime.utcnow().isoformat(),
-                "last_seen": datetime.utcnow().isoformat(),
+                "first_seen": now,
+                "last_seen": now,
                 "context": context or {}
             }
         
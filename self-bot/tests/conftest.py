@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+import orjson
+
+# main.py reads config.json and creates logs/ in the working directory at import time,
+# so import it once from a scratch directory holding a minimal config
+SELF_BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SELF_BOT_DIR)
+
+_workdir = tempfile.mkdtemp(prefix="self-bot-tests-")
+with open(os.path.join(_workdir, "config.json"), "wb") as f:
+    f.write(orjson.dumps({"tokens": {}, "webhooks": {}, "settings": {}}))
+os.chdir(_workdir)
+
+import main  # noqa: E402,F401
@@ -0,0 +1,62 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    """Return a function that installs TOKENS and rebuilds the indexes; the old indexes come back afterwards."""
+    for name in ("TOKENS", "SERVER_INDEX", "MONITORED_SERVER_IDS", "TOKEN_BY_USER_ID", "TOKEN_BY_USERNAME_LOWER"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+
+    def install(new_tokens):
+        monkeypatch.setattr(main, "TOKENS", new_tokens)
+        main.build_config_indexes()
+
+    return install
+
+
+def test_build_config_indexes_uses_int_ids(tokens):
+    tokens({
+        "token-a": {"servers": {"100": {"excluded_categories": ["200"], "excluded_channels": [300]}}},
+    })
+
+    assert main.MONITORED_SERVER_IDS == frozenset({100})
+    assert main.get_server_exclusions(100) == (frozenset({200}), frozenset({300}))
+    assert main.get_server_exclusions("100") == (frozenset({200}), frozenset({300}))
+    assert main.get_server_exclusions(999) == (frozenset(), frozenset())
+
+
+def test_build_config_indexes_first_token_wins(tokens):
+    tokens({
+        "token-a": {"servers": {"100": {"excluded_channels": [1]}}},
+        "token-b": {"servers": {"100": {"excluded_channels": [2]}, "101": {}}},
+    })
+
+    assert main.MONITORED_SERVER_IDS == frozenset({100, 101})
+    assert main.get_server_exclusions(100) == (frozenset(), frozenset({1}))
+
+
+def test_build_config_indexes_skips_invalid_ids(tokens):
+    tokens({
+        "token-a": {"servers": {
+            "not-a-server": {"excluded_channels": [1]},
+            "100": {"excluded_categories": ["oops", 200], "excluded_channels": [None, 300]},
+        }},
+    })
+
+    assert main.MONITORED_SERVER_IDS == frozenset({100})
+    assert main.get_server_exclusions(100) == (frozenset({200}), frozenset({300}))
+
+
+def test_build_config_indexes_maps_user_info_to_token(tokens):
+    tokens({
+        "token-a": {"servers": {}, "user_info": {"id": "42", "name": "SomeUser"}},
+    })
+
+    assert main.TOKEN_BY_USER_ID["42"] == "token-a"
+    assert main.TOKEN_BY_USERNAME_LOWER["someuser"] == "token-a"
+
+
+def test_parse_ids_skips_non_numeric():
+    assert main.parse_ids(["1", 2, "x", None], "server") == frozenset({1, 2})
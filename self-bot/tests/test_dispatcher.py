@@ -0,0 +1,117 @@
+import asyncio
+
+import orjson
+
+import main
+
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self.body
+
+    async def text(self):
+        return orjson.dumps(self.body).decode()
+
+
+class FakeSession:
+    def __init__(self, status, body):
+        self.response = FakeResponse(status, body)
+        self.posts = []
+
+    def post(self, url, data, headers, timeout):
+        self.posts.append((url, orjson.loads(data)))
+        return self.response
+
+
+class FakeRedis:
+    def __init__(self):
+        self.zadds = []
+
+    async def zadd(self, key, mapping):
+        # Record message_id -> attempt for each retry entry
+        retries = [orjson.loads(entry) for entry in mapping]
+        self.zadds.append((key, {retry["payload"]["message_id"]: retry["attempt"] for retry in retries}))
+
+
+def make_dispatcher(status=200, body=None):
+    dispatcher = main.Dispatcher(FakeRedis(), "http://bot/process_batch")
+    dispatcher.session = FakeSession(status, body if body is not None else {"status": "success", "failed": []})
+    return dispatcher
+
+
+def make_batch(count):
+    return [{"message_id": str(i), "content": f"message {i}"} for i in range(count)]
+
+
+def test_post_batch_retries_only_failed_indices():
+    dispatcher = make_dispatcher(body={"status": "success", "failed": [1, 2]})
+    batch = make_batch(3)
+
+    asyncio.run(dispatcher.post_batch(batch))
+
+    assert dispatcher.session.posts == [("http://bot/process_batch", batch)]
+    assert dispatcher.redis_client.zadds == [(main.RETRY_QUEUE, {"1": 0, "2": 0})]
+
+
+def test_post_batch_accepted_batch_schedules_nothing():
+    dispatcher = make_dispatcher()
+
+    asyncio.run(dispatcher.post_batch(make_batch(3)))
+
+    assert dispatcher.redis_client.zadds == []
+
+
+def test_post_batch_rejected_batch_is_not_retried():
+    dispatcher = make_dispatcher(status=400, body={"status": "error", "message": "Expected a list of messages"})
+
+    asyncio.run(dispatcher.post_batch(make_batch(3)))
+
+    assert dispatcher.redis_client.zadds == []
+
+
+def test_post_batch_server_error_retries_whole_batch():
+    dispatcher = make_dispatcher(status=500, body={"status": "error", "message": "boom"})
+
+    asyncio.run(dispatcher.post_batch(make_batch(3)))
+
+    assert dispatcher.redis_client.zadds == [(main.RETRY_QUEUE, {"0": 0, "1": 0, "2": 0})]
+
+
+def test_schedule_retries_drops_exhausted_messages():
+    dispatcher = make_dispatcher()
+    retries = [({"message_id": "a"}, main.RETRY_MAX_ATTEMPTS), ({"message_id": "b"}, 3)]
+
+    asyncio.run(dispatcher.schedule_retries(retries))
+
+    assert dispatcher.dropped_messages == 1
+    assert dispatcher.redis_client.zadds == [(main.RETRY_QUEUE, {"b": 3})]
+
+
+def test_schedule_retries_all_exhausted_skips_redis():
+    dispatcher = make_dispatcher()
+
+    asyncio.run(dispatcher.schedule_retries([({"message_id": "a"}, main.RETRY_MAX_ATTEMPTS)]))
+
+    assert dispatcher.dropped_messages == 1
+    assert dispatcher.redis_client.zadds == []
+
+
+def test_enqueue_drops_oldest_when_full():
+    dispatcher = make_dispatcher()
+    dispatcher.http_queue = asyncio.Queue(maxsize=2)
+
+    for message_data in make_batch(3):
+        dispatcher.forward(message_data)
+
+    assert dispatcher.dropped_messages == 1
+    assert [dispatcher.http_queue.get_nowait()["message_id"] for _ in range(2)] == ["1", "2"]
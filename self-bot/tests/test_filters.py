@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+def dm(content):
+    return SimpleNamespace(content=content)
+
+
+@pytest.mark.parametrize("content", [
+    "hey, are you still selling those dunks?",
+    "thanks for the help earlier",
+    "",
+])
+def test_is_spam_dm_allows_ordinary_messages(content):
+    assert not main.is_spam_dm(dm(content))
+
+
+@pytest.mark.parametrize("content", [
+    "FREE NITRO giveaway, just verify",
+    "guaranteed profit from crypto trading",
+    "see http://a.example and http://b.example",
+    "x" * 501,
+])
+def test_is_spam_dm_flags_spam(content):
+    assert main.is_spam_dm(dm(content))
+
+
+def test_is_spam_dm_needs_two_distinct_keywords():
+    assert not main.is_spam_dm(dm("free free free"))
+    assert main.is_spam_dm(dm("free gift"))
+
+
+def test_spam_keyword_re_finds_overlapping_keywords():
+    found = {match.group(1) for match in main._SPAM_KEYWORD_RE.finditer("join discord.gg/abc")}
+    assert found == {"join", "discord.gg"}
+    found = {match.group(1) for match in main._SPAM_KEYWORD_RE.finditer("servercommunity")}
+    assert found == {"server", "community"}
+
+
+def test_spam_keyword_re_matches_every_keyword():
+    for keyword in main.SPAM_KEYWORDS:
+        assert [match.group(1) for match in main._SPAM_KEYWORD_RE.finditer(keyword)][0] == keyword
+
+
+@pytest.mark.parametrize("error", [
+    "Improper token has been passed.",
+    "401 Unauthorized (error code: 0): 401: Unauthorized",
+])
+def test_invalid_token_re_matches_login_failures(error):
+    assert main._INVALID_TOKEN_RE.search(error)
+
+
+@pytest.mark.parametrize("error", [
+    "Cannot connect to host discord.com:443",
+    "503 Service Unavailable",
+])
+def test_invalid_token_re_ignores_transient_errors(error):
+    assert not main._INVALID_TOKEN_RE.search(error)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("5-12-drops", True),
+    ("3pm-restock", True),
+    ("12-25", True),
+    ("general", False),
+    ("nike-snkrs", False),
+    ("2024-releases", False),
+])
+def test_is_time_or_date_based(name, expected):
+    assert main.is_time_or_date_based(name) is expected